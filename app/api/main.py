@@ -1,18 +1,79 @@
-from fastapi import FastAPI, UploadFile, File
-from fastapi.responses import FileResponse, HTMLResponse, StreamingResponse
+from fastapi import FastAPI, UploadFile, File, Request
+from fastapi.responses import FileResponse, HTMLResponse, JSONResponse, PlainTextResponse, Response, StreamingResponse
+from contextlib import asynccontextmanager, nullcontext
+from typing import List
+from io import BytesIO
+from urllib.parse import quote
+import asyncio
+import json
 import os
-import uuid
 import tempfile
-from io import BytesIO
+import threading
+import time
+import uuid
+import zipfile
+
+from app.api.landing_page import (
+    LANDING_PAGE_BYTES, LANDING_PAGE_ETAG, LANDING_PAGE_GZIP, LANDING_PAGE_GZIP_ETAG, etag_matches
+)
+from app.core.pdf_pipeline import PIPELINE_VERSION, run_pipeline, warm_up
+from app.core.pdf_worker import (
+    ClientBusyError, ClientLimiter, ConversionPool, JobTimeoutError, PoolBusyError, SingleFlight
+)
+from app.core.pdf_preflight import MAX_BYTES, InvalidPdfError, JobTooLargeError, preflight
+from app.core.pdf_cache import ConversionCache, cache_key
+from app.core.pdf_jobs import BACKGROUND_JOB_TIMEOUT, POOL_RETRY_INTERVAL, JobStore, run_job_pipeline
+from app.core.pdf_metrics import REGISTRY, server_timing
+
+
+# Shared pool that runs conversions off the event loop
+conversion_pool = ConversionPool()
+
+# Load the PDF libraries in the background at startup instead of on the first
+# conversion (off by default, serverless cold starts only pay for what they use)
+WARMUP = os.getenv("PDF_WARMUP", "0") == "1"
+
 
-from app.core.pdf_extract import extract_best_text
-from app.core.pdf_contentType import group_content_under_headings
-from app.core.pdf_toWord import build_word_document
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if job_store:
+        job_store.start(job_converter(asyncio.get_running_loop()))
+    if WARMUP:
+        threading.Thread(target=warm_up, daemon=True).start()
+    yield
+    if job_store:
+        job_store.stop()
+    conversion_pool.shutdown()
 
-app = FastAPI()
+
+app = FastAPI(lifespan=lifespan)
 
 UPLOAD_DIR = "storage/uploadFiles"
 OUTPUT_DIR = "storage/outputFiles"
+JOBS_DIR = "storage/jobs"
+DOCX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+# Upper bound on PDFs accepted by one /batch request
+BATCH_MAX_FILES = int(os.getenv("PDF_BATCH_MAX_FILES", "200"))
+# Seconds a /batch file keeps retrying while the conversion pool is full
+# (other requests hold it), the batch is answered with 503 after that
+BATCH_BUSY_WAIT = float(os.getenv("PDF_BATCH_BUSY_WAIT", "30"))
+
+# Send a Server-Timing header with per-stage timings on every /upload
+TIMING_HEADER = os.getenv("PDF_TIMING_HEADER", "0") == "1"
+
+# Responses are sent in chunks of this size
+STREAM_CHUNK_SIZE = int(os.getenv("PDF_STREAM_CHUNK_SIZE", str(64 * 1024)))
+
+# Batch zips stay in memory up to this size, larger ones are spooled to a temp file
+BATCH_SPOOL_BYTES = int(os.getenv("PDF_BATCH_SPOOL_BYTES", str(16 * 1024 * 1024)))
+
+# Request header naming the client for the per-client limits when running
+# behind a proxy (e.g. X-Forwarded-For), otherwise the peer address is used
+CLIENT_HEADER = os.getenv("PDF_CLIENT_HEADER", "")
+# Proxies in front of the API that append to CLIENT_HEADER: the client is the
+# entry the outermost of them appended, anything left of it is client supplied
+TRUSTED_PROXY_HOPS = int(os.getenv("PDF_TRUSTED_PROXY_HOPS", "1"))
 
 try:
     os.makedirs(UPLOAD_DIR, exist_ok=True)
@@ -20,457 +81,446 @@ try:
 except Exception as e:
     print(f"Warning: Could not create storage directories: {e}")
 
+# Finished conversions keyed by PDF content hash
+conversion_cache = ConversionCache(os.path.join(OUTPUT_DIR, "cache"))
+
+# Conversions in progress, keyed the same way: identical PDFs uploaded
+# at the same time share one conversion
+single_flight = SingleFlight()
+
+# Conversions in flight per client
+client_limiter = ClientLimiter()
+
+# Background conversion jobs (submit / poll / download)
+try:
+    job_store = JobStore(JOBS_DIR)
+except Exception as e:
+    print(f"Warning: job API disabled, could not create {JOBS_DIR}: {e}")
+    job_store = None
+
 
 @app.get("/", response_class=HTMLResponse)
-def upload_page():
-    return """ 
-  
-    <!DOCTYPE html>
-    <html lang="en">
-    <head>
-        <meta charset="UTF-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1.0">
-        <title>PDF to Word Converter | Convert PDFs Instantly</title>
-        <style>
-            * {
-                margin: 0;
-                padding: 0;
-                box-sizing: border-box;
-            }
-            
-            body {
-                font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-                background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                min-height: 100vh;
-                display: flex;
-                align-items: center;
-                justify-content: center;
-                padding: 20px;
-            }
-            
-            .container {
-                background: white;
-                border-radius: 20px;
-                box-shadow: 0 20px 60px rgba(0, 0, 0, 0.3);
-                max-width: 600px;
-                width: 100%;
-                padding: 50px;
-                text-align: center;
-            }
-            
-            .header {
-                margin-bottom: 40px;
-            }
-            
-            .header h1 {
-                color: #333;
-                font-size: 2.5em;
-                margin-bottom: 10px;
-                background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                -webkit-background-clip: text;
-                -webkit-text-fill-color: transparent;
-                background-clip: text;
-            }
-            
-            .header p {
-                color: #666;
-                font-size: 1.1em;
-                font-weight: 300;
-            }
-            
-            .upload-area {
-                border: 3px dashed #667eea;
-                border-radius: 15px;
-                padding: 40px;
-                margin: 30px 0;
-                transition: all 0.3s ease;
-                cursor: pointer;
-                background: linear-gradient(135deg, rgba(102, 126, 234, 0.05) 0%, rgba(118, 75, 162, 0.05) 100%);
-            }
-            
-            .upload-area:hover {
-                border-color: #764ba2;
-                background: linear-gradient(135deg, rgba(102, 126, 234, 0.1) 0%, rgba(118, 75, 162, 0.1) 100%);
-            }
-            
-            .upload-area.dragover {
-                border-color: #764ba2;
-                background: linear-gradient(135deg, rgba(102, 126, 234, 0.2) 0%, rgba(118, 75, 162, 0.2) 100%);
-                transform: scale(1.02);
-            }
-            
-            .upload-icon {
-                font-size: 3em;
-                margin-bottom: 15px;
-            }
-            
-            .upload-text {
-                color: #333;
-                font-size: 1.2em;
-                font-weight: 600;
-                margin-bottom: 8px;
-            }
-            
-            .upload-subtext {
-                color: #999;
-                font-size: 0.95em;
-            }
-            
-            .file-input {
-                display: none;
-            }
-            
-            .button-group {
-                display: flex;
-                gap: 15px;
-                margin-top: 30px;
-            }
-            
-            .btn {
-                flex: 1;
-                padding: 14px 30px;
-                border: none;
-                border-radius: 10px;
-                font-size: 1.05em;
-                font-weight: 600;
-                cursor: pointer;
-                transition: all 0.3s ease;
-                text-transform: uppercase;
-                letter-spacing: 0.5px;
-            }
-            
-            .btn-primary {
-                background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                color: white;
-            }
-            
-            .btn-primary:hover:not(:disabled) {
-                transform: translateY(-2px);
-                box-shadow: 0 10px 25px rgba(102, 126, 234, 0.4);
-            }
-            
-            .btn-primary:disabled {
-                opacity: 0.5;
-                cursor: not-allowed;
-            }
-            
-            .btn-secondary {
-                background: #f0f0f0;
-                color: #333;
-            }
-            
-            .btn-secondary:hover {
-                background: #e0e0e0;
-                transform: translateY(-2px);
-            }
-            
-            .file-name {
-                margin-top: 20px;
-                padding: 15px;
-                background: #f9f9f9;
-                border-radius: 10px;
-                color: #333;
-                font-weight: 500;
-            }
-            
-            .loading {
-                display: none;
-                text-align: center;
-                margin: 30px 0;
-            }
-            
-            .spinner {
-                border: 4px solid #f0f0f0;
-                border-top: 4px solid #667eea;
-                border-radius: 50%;
-                width: 40px;
-                height: 40px;
-                animation: spin 1s linear infinite;
-                margin: 0 auto 15px;
-            }
-            
-            @keyframes spin {
-                0% { transform: rotate(0deg); }
-                100% { transform: rotate(360deg); }
-            }
-            
-            .loading-text {
-                color: #667eea;
-                font-weight: 600;
-            }
-            
-            .success {
-                display: none;
-                padding: 20px;
-                background: #d4edda;
-                border: 2px solid #28a745;
-                border-radius: 10px;
-                color: #155724;
-                margin: 20px 0;
-            }
-            
-            .error {
-                display: none;
-                padding: 20px;
-                background: #f8d7da;
-                border: 2px solid #dc3545;
-                border-radius: 10px;
-                color: #721c24;
-                margin: 20px 0;
-            }
-            
-            .features {
-                margin-top: 40px;
-                padding-top: 40px;
-                border-top: 2px solid #f0f0f0;
-                display: grid;
-                grid-template-columns: 1fr 1fr 1fr;
-                gap: 20px;
-            }
-            
-            .feature {
-                color: #666;
-            }
-            
-            .feature-icon {
-                font-size: 2em;
-                margin-bottom: 10px;
-            }
-            
-            .feature-text {
-                font-size: 0.9em;
-                font-weight: 500;
-            }
-            
-            @media (max-width: 600px) {
-                .container {
-                    padding: 30px;
-                }
-                
-                .header h1 {
-                    font-size: 1.8em;
-                }
-                
-                .features {
-                    grid-template-columns: 1fr;
-                }
-                
-                .button-group {
-                    flex-direction: column;
-                }
-            }
-        </style>
-    </head>
-    <body>
-        <div class="container">
-            <div class="header">
-                <h1>📄 PDF to Word</h1>
-                <p>Convert your PDF files to Word documents instantly</p>
-            </div>
-            
-            <div class="upload-area" id="uploadArea">
-                <div class="upload-icon">⬆️</div>
-                <div class="upload-text">Drag and drop your PDF here</div>
-                <div class="upload-subtext">or click to browse</div>
-                <input type="file" id="fileInput" class="file-input" accept=".pdf" />
-            </div>
-            
-            <div class="file-name" id="fileName" style="display: none;"></div>
-            
-            <div class="loading" id="loading">
-                <div class="spinner"></div>
-                <div class="loading-text">Converting your PDF...</div>
-            </div>
-            
-            <div class="success" id="success">
-                ✓ Conversion successful! Your file is ready to download.
-            </div>
-            
-            <div class="error" id="error"></div>
-            
-            <div class="button-group">
-                <button class="btn btn-primary" id="convertBtn" style="display: none;">Convert to Word</button>
-                <button class="btn btn-secondary" id="clearBtn" style="display: none;">Clear</button>
-            </div>
-            
-            <div class="features">
-                <div class="feature">
-                    <div class="feature-icon">⚡</div>
-                    <div class="feature-text">Fast Conversion</div>
-                </div>
-                <div class="feature">
-                    <div class="feature-icon">🔒</div>
-                    <div class="feature-text">Secure & Private</div>
-                </div>
-                <div class="feature">
-                    <div class="feature-icon">✨</div>
-                    <div class="feature-text">High Quality</div>
-                </div>
-            </div>
-        </div>
-        
-        <script>
-            const uploadArea = document.getElementById('uploadArea');
-            const fileInput = document.getElementById('fileInput');
-            const fileName = document.getElementById('fileName');
-            const convertBtn = document.getElementById('convertBtn');
-            const clearBtn = document.getElementById('clearBtn');
-            const loading = document.getElementById('loading');
-            const success = document.getElementById('success');
-            const error = document.getElementById('error');
-            
-            let selectedFile = null;
-            
-            // Click to select file
-            uploadArea.addEventListener('click', () => fileInput.click());
-            
-            // File input change
-            fileInput.addEventListener('change', (e) => {
-                if (e.target.files.length > 0) {
-                    selectedFile = e.target.files[0];
-                    displayFileName();
-                }
-            });
-            
-            // Drag and drop
-            uploadArea.addEventListener('dragover', (e) => {
-                e.preventDefault();
-                uploadArea.classList.add('dragover');
-            });
-            
-            uploadArea.addEventListener('dragleave', () => {
-                uploadArea.classList.remove('dragover');
-            });
-            
-            uploadArea.addEventListener('drop', (e) => {
-                e.preventDefault();
-                uploadArea.classList.remove('dragover');
-                
-                const files = e.dataTransfer.files;
-                if (files.length > 0) {
-                    const file = files[0];
-                    if (file.type === 'application/pdf') {
-                        selectedFile = file;
-                        fileInput.files = files;
-                        displayFileName();
-                    } else {
-                        showError('Please drop a PDF file');
-                    }
-                }
-            });
-            
-            function displayFileName() {
-                if (selectedFile) {
-                    const size = (selectedFile.size / 1024 / 1024).toFixed(2);
-                    fileName.textContent = `📎 ${selectedFile.name} (${size} MB)`;
-                    fileName.style.display = 'block';
-                    convertBtn.style.display = 'flex';
-                    clearBtn.style.display = 'flex';
-                    success.style.display = 'none';
-                    error.style.display = 'none';
-                }
-            }
-            
-            function showError(message) {
-                error.textContent = 'error: ' + message;
-                error.style.display = 'block';
-                success.style.display = 'none';
-            }
-            
-            clearBtn.addEventListener('click', () => {
-                selectedFile = null;
-                fileInput.value = '';
-                fileName.style.display = 'none';
-                convertBtn.style.display = 'none';
-                clearBtn.style.display = 'none';
-                success.style.display = 'none';
-                error.style.display = 'none';
-            });
-            
-            convertBtn.addEventListener('click', async () => {
-                if (!selectedFile) return;
-                
-                const formData = new FormData();
-                formData.append('file', selectedFile);
-                
-                loading.style.display = 'block';
-                convertBtn.disabled = true;
-                clearBtn.disabled = true;
-                success.style.display = 'none';
-                error.style.display = 'none';
-                
-                try {
-                    const response = await fetch('/upload', {
-                        method: 'POST',
-                        body: formData
-                    });
-                    
-                    if (response.ok) {
-                        const blob = await response.blob();
-                        const url = window.URL.createObjectURL(blob);
-                        const a = document.createElement('a');
-                        a.href = url;
-                        a.download = selectedFile.name.replace('.pdf', '.docx');
-                        document.body.appendChild(a);
-                        a.click();
-                        window.URL.revokeObjectURL(url);
-                        document.body.removeChild(a);
-                        
-                        loading.style.display = 'none';
-                        success.style.display = 'block';
-                        clearBtn.disabled = false;
-                    } else {
-                        throw new Error('Conversion failed');
-                    }
-                } catch (err) {
-                    loading.style.display = 'none';
-                    showError('Failed to convert PDF. Please try again.');
-                    convertBtn.disabled = false;
-                    clearBtn.disabled = false;
-                }
-            });
-        </script>
-    </body>
-    </html>
+def upload_page(request: Request):
+    headers = {"Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+
+    # Precomputed page: gzip when the client accepts it, 304 when it is unchanged
+    use_gzip = "gzip" in request.headers.get("accept-encoding", "")
+    headers["ETag"] = LANDING_PAGE_GZIP_ETAG if use_gzip else LANDING_PAGE_ETAG
+
+    if etag_matches(request.headers.get("if-none-match")):
+        return Response(status_code=304, headers=headers)
+
+    if use_gzip:
+        headers["Content-Encoding"] = "gzip"
+        return Response(LANDING_PAGE_GZIP, media_type="text/html; charset=utf-8", headers=headers)
+
+    return Response(LANDING_PAGE_BYTES, media_type="text/html; charset=utf-8", headers=headers)
+
+
+def download_name(upload_name: str, extension: str) -> str:
+    """
+    Output file name for an upload: "report.pdf" -> "report.docx".
+    """
+    stem = os.path.splitext(os.path.basename(upload_name or ""))[0]
+    return (stem or "converted") + extension
+
+
+def attachment_header(filename: str) -> str:
+    """
+    Content-Disposition value, RFC 5987 encoded when the name is not plain ASCII.
+    """
+    quoted = quote(filename)
+    if quoted != filename:
+        return f"attachment; filename*=utf-8''{quoted}"
+    return f'attachment; filename="{filename}"'
+
+
+def client_id(request: Request):
+    """
+    Identifies the client a request counts against for the per-client limits.
+    With CLIENT_HEADER, the entry TRUSTED_PROXY_HOPS from the right is used
+    (the leftmost one when the header has fewer entries).
+    """
+    if CLIENT_HEADER:
+        value = request.headers.get(CLIENT_HEADER)
+        if value:
+            entries = [entry.strip() for entry in value.split(",")]
+            return entries[-min(max(1, TRUSTED_PROXY_HOPS), len(entries))]
+
+    return request.client.host if request.client else None
+
+
+def rejection_response(error: Exception):
+    """
+    JSON error response for a conversion that was not admitted,
+    or None when error is not an admission error.
+    """
+    if isinstance(error, JobTooLargeError):
+        REGISTRY.inc("pdf_rejected_total", reason="too_large")
+        return JSONResponse({"error": str(error)}, status_code=413)
+    if isinstance(error, ClientBusyError):
+        REGISTRY.inc("pdf_rejected_total", reason="client_limit")
+        return JSONResponse({"error": str(error)}, status_code=429, headers={"Retry-After": "5"})
+    if isinstance(error, InvalidPdfError):
+        REGISTRY.inc("pdf_rejected_total", reason="invalid")
+        return JSONResponse({"error": str(error)}, status_code=400)
+    return None
+
+
+def iter_chunks(data: bytes):
+    """
+    Yields data in STREAM_CHUNK_SIZE pieces, only one chunk is copied at a time.
+    """
+    for offset in range(0, len(data), STREAM_CHUNK_SIZE):
+        yield data[offset:offset + STREAM_CHUNK_SIZE]
+
+
+def iter_file_chunks(file_obj):
+    """
+    Yields a file from the start in STREAM_CHUNK_SIZE pieces and closes it.
+    """
+    try:
+        file_obj.seek(0)
+        while True:
+            chunk = file_obj.read(STREAM_CHUNK_SIZE)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        file_obj.close()
+
+
+async def convert_cached(pdf_content: bytes, client=None, progress_path: str = None, timeout: float = None):
+    """
+    Returns (docx_bytes, "HIT" | "MISS" | "COALESCED", stage timings,
+    image-only page numbers), converting in the worker pool on a miss.
+    Concurrent misses for the same PDF wait for the first one's
+    conversion ("COALESCED").
+
+    A miss that starts a new conversion holds one of the client's slots
+    (ClientBusyError when none is free) and goes through preflight first
+    (JobTooLargeError, InvalidPdfError). progress_path: file the
+    conversion writes its progress to (background jobs). timeout:
+    seconds the conversion may take, the pool's timeout by default.
+    """
+    started = time.perf_counter()
+
+    # Identical PDFs are served from the cache (the disk tier is file I/O, kept off the event loop)
+    key = cache_key(pdf_content, PIPELINE_VERSION)
+    entry = await asyncio.to_thread(conversion_cache.get_entry, key)
+    if entry is not None:
+        docx_bytes, info = entry
+        return docx_bytes, "HIT", {"cache": time.perf_counter() - started}, info.get("image_pages", [])
+
+    # Joining a conversion already in progress costs nothing, only new ones count against the client
+    with nullcontext() if key in single_flight else client_limiter.hold(client):
+        result, shared = await single_flight.run(key, convert_and_store, key, pdf_content, progress_path, timeout)
+
+    timings = dict(result["timings"])
+    timings["total"] = time.perf_counter() - started
+    return result["docx"], "COALESCED" if shared else "MISS", timings, result["image_pages"]
+
+
+async def convert_and_store(key: str, pdf_content: bytes, progress_path: str = None, timeout: float = None) -> dict:
+    """
+    One conversion of a cache miss, shared by every request coalesced on it.
+    """
+    # Page count, size and text check before queueing, the estimated
+    # cost decides the job's place in the pool's queue
+    estimate = await asyncio.to_thread(preflight, pdf_content)
+
+    # Extract, structure and build the DOCX in the worker pool
+    if progress_path:
+        result = await conversion_pool.run(run_job_pipeline, pdf_content, progress_path,
+                                           cost=estimate["cost"], timeout=timeout)
+    else:
+        result = await conversion_pool.run(run_pipeline, pdf_content, cost=estimate["cost"], timeout=timeout)
+    await asyncio.to_thread(
+        conversion_cache.put, key, result["docx"], result["structured"],
+        {"image_pages": result["image_pages"]}
+    )
+
+    # Timings come back from the worker, the registry lives in this process
+    REGISTRY.record_conversion(
+        result["timings"], result["counters"], result["pages"],
+        len(pdf_content), len(result["docx"]), result["seconds"]
+    )
+    return result
+
+
+def job_converter(loop):
+    """
+    Conversion function for the job worker threads. Jobs go through
+    convert_cached on the event loop like uploads: conversion pool
+    (scheduling), conversion cache and coalescing, with the longer
+    BACKGROUND_JOB_TIMEOUT.
     """
+    def convert(pdf_content: bytes, progress_path: str):
+        future = asyncio.run_coroutine_threadsafe(
+            convert_cached(pdf_content, progress_path=progress_path, timeout=BACKGROUND_JOB_TIMEOUT), loop
+        )
+        docx_bytes, _, _, image_pages = future.result()
+        return docx_bytes, image_pages
+
+    return convert
 
 
 @app.post("/upload")
-async def upload_pdf(file: UploadFile = File(...)):
-    pdf_path = None
+async def upload_pdf(request: Request, file: UploadFile = File(...), timing: bool = False):
     try:
-        # Read file into memory
+        # Read file into memory, extraction works on the bytes directly
         pdf_content = await file.read()
         
-        # Create temporary file for processing
-        with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp_pdf:
-            pdf_path = tmp_pdf.name
-            tmp_pdf.write(pdf_content)
+        docx_bytes, cache_status, timings, image_pages = await convert_cached(pdf_content, client_id(request))
         
-        # Extract text and structure
-        text, _ = extract_best_text(pdf_path)
-        structured = group_content_under_headings(text)
+        headers = {
+            "Content-Disposition": attachment_header(download_name(file.filename, ".docx")),
+            "Content-Length": str(len(docx_bytes)),
+            "X-Cache": cache_status
+        }
+        if image_pages:
+            # Scanned pages without extractable text (empty unless OCR is attached)
+            headers["X-Image-Pages"] = ",".join(map(str, image_pages))
+        if timing or TIMING_HEADER:
+            headers["Server-Timing"] = server_timing(timings)
         
-        # Generate DOCX in memory
-        docx_buffer = BytesIO()
-        build_word_document(structured, docx_buffer)
-        docx_buffer.seek(0)
-        
-        # Return streaming response
+        # Send the document in fixed-size chunks, without copying it as a whole
         return StreamingResponse(
-            iter([docx_buffer.getvalue()]),
-            media_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-            headers={"Content-Disposition": "attachment; filename=converted.docx"}
+            iter_chunks(docx_bytes),
+            media_type=DOCX_MEDIA_TYPE,
+            headers=headers
         )
+    except PoolBusyError as e:
+        REGISTRY.inc("pdf_rejected_total", reason="busy")
+        return JSONResponse({"error": str(e)}, status_code=503, headers={"Retry-After": "5"})
+    except JobTimeoutError as e:
+        REGISTRY.inc("pdf_rejected_total", reason="timeout")
+        return JSONResponse({"error": str(e)}, status_code=504)
+    except (JobTooLargeError, ClientBusyError, InvalidPdfError) as e:
+        return rejection_response(e)
     except Exception as e:
+        REGISTRY.inc("pdf_failures_total")
         print(f"Error during conversion: {str(e)}")
         import traceback
         traceback.print_exc()
-        return {"error": str(e), "details": traceback.format_exc()}, 500
-    finally:
-        # Clean up temporary file
-        if pdf_path and os.path.exists(pdf_path):
-            try:
-                os.remove(pdf_path)
-            except Exception as e:
-                print(f"Could not delete temp file: {e}")
\ No newline at end of file
+        return JSONResponse({"error": str(e), "details": traceback.format_exc()}, status_code=500)
+
+
+def collect_batch_pdfs(uploads):
+    """
+    Flattens uploaded PDFs and zip archives into a list of (name, pdf_bytes)
+    and a list of rejected archive members ({"file", "error"}).
+
+    Zip members are checked before they are inflated: members over
+    MAX_BYTES are rejected, and collection stops once there are more
+    than BATCH_MAX_FILES PDFs (the caller rejects the batch). Members are
+    read at most MAX_BYTES + 1 bytes, whatever their header claims.
+    """
+    pdfs = []
+    rejected = []
+
+    for name, content in uploads:
+        if len(pdfs) > BATCH_MAX_FILES:
+            break
+
+        if not zipfile.is_zipfile(BytesIO(content)):
+            pdfs.append((os.path.basename(name or "document.pdf"), content))
+            continue
+
+        with zipfile.ZipFile(BytesIO(content)) as archive:
+            for info in archive.infolist():
+                member = info.filename
+                if info.is_dir() or member.startswith("__MACOSX/") or not member.lower().endswith(".pdf"):
+                    continue
+                if len(pdfs) > BATCH_MAX_FILES:
+                    break
+
+                too_large = {"file": os.path.basename(member), "error": f"JobTooLargeError: over {MAX_BYTES} bytes"}
+                if MAX_BYTES and info.file_size > MAX_BYTES:
+                    rejected.append(too_large)
+                    continue
+
+                try:
+                    with archive.open(info) as member_file:
+                        pdf_bytes = member_file.read(MAX_BYTES + 1) if MAX_BYTES else member_file.read()
+                except (zipfile.BadZipFile, OSError) as e:
+                    # e.g. a CRC mismatch when the header lies about the size
+                    rejected.append({"file": os.path.basename(member), "error": f"{type(e).__name__}: {e}"})
+                    continue
+                if MAX_BYTES and len(pdf_bytes) > MAX_BYTES:
+                    rejected.append(too_large)
+                    continue
+
+                pdfs.append((os.path.basename(member), pdf_bytes))
+
+    return pdfs, rejected
+
+
+@app.post("/batch")
+async def batch_convert(request: Request, files: List[UploadFile] = File(...)):
+    """
+    Converts several PDFs (uploaded directly or inside zip archives)
+    and returns a zip of DOCX files plus an errors.json for failures.
+    The whole batch counts as one conversion against the client's limit.
+    """
+    uploads = [(upload.filename, await upload.read()) for upload in files]
+    pdfs, rejected = collect_batch_pdfs(uploads)
+
+    if not pdfs and not rejected:
+        return JSONResponse({"error": "No PDF files found"}, status_code=400)
+    if len(pdfs) > BATCH_MAX_FILES:
+        return JSONResponse({"error": f"Too many files, limit is {BATCH_MAX_FILES}"}, status_code=413)
+
+    # Never queue more than the pool can run, so a batch cannot trip the 503 backpressure on itself
+    slots = asyncio.Semaphore(conversion_pool.workers)
+
+    async def convert_one(pdf_content):
+        async with slots:
+            # A full pool is temporary, it is not a failure of this file
+            deadline = time.monotonic() + BATCH_BUSY_WAIT
+            while True:
+                try:
+                    docx_bytes, _, _, _ = await convert_cached(pdf_content)
+                    return docx_bytes
+                except PoolBusyError:
+                    if time.monotonic() >= deadline:
+                        raise
+                    await asyncio.sleep(POOL_RETRY_INTERVAL)
+
+    try:
+        with client_limiter.hold(client_id(request)):
+            results = await asyncio.gather(*(convert_one(content) for _, content in pdfs), return_exceptions=True)
+    except ClientBusyError as e:
+        return rejection_response(e)
+
+    if any(isinstance(result, PoolBusyError) for result in results):
+        REGISTRY.inc("pdf_rejected_total", reason="busy")
+        return JSONResponse({"error": "Conversion queue is full"}, status_code=503, headers={"Retry-After": "5"})
+
+    archive_file = tempfile.SpooledTemporaryFile(max_size=BATCH_SPOOL_BYTES)
+    used_names = set()
+    errors = list(rejected)
+
+    with zipfile.ZipFile(archive_file, "w", zipfile.ZIP_DEFLATED) as archive:
+        for (name, _), result in zip(pdfs, results):
+            if isinstance(result, Exception):
+                errors.append({"file": name, "error": f"{type(result).__name__}: {result}"})
+                continue
+
+            # Keep names unique when several uploads share a file name
+            stem = os.path.splitext(name)[0]
+            docx_name = stem + ".docx"
+            counter = 1
+            while docx_name in used_names:
+                counter += 1
+                docx_name = f"{stem} ({counter}).docx"
+            used_names.add(docx_name)
+
+            archive.writestr(docx_name, result)
+
+        if errors:
+            archive.writestr("errors.json", json.dumps(errors, indent=2))
+
+    archive_size = archive_file.tell()
+
+    return StreamingResponse(
+        iter_file_chunks(archive_file),
+        media_type="application/zip",
+        headers={
+            "Content-Disposition": attachment_header("converted.zip"),
+            "Content-Length": str(archive_size),
+            "X-Batch-Converted": str(len(pdfs) + len(rejected) - len(errors)),
+            "X-Batch-Failed": str(len(errors))
+        }
+    )
+
+
+@app.get("/warmup")
+async def warmup():
+    """
+    Loads the PDF libraries in this process and in a pool worker, e.g.
+    for a platform warmer to call after a deploy. Returns seconds spent.
+    """
+    try:
+        pool_seconds = await conversion_pool.run(warm_up)
+    except PoolBusyError as e:
+        return JSONResponse({"error": str(e)}, status_code=503, headers={"Retry-After": "5"})
+
+    return {"process": await asyncio.to_thread(warm_up), "pool": pool_seconds}
+
+
+@app.get("/cache/stats")
+def cache_stats():
+    return dict(conversion_cache.stats(), coalescing=single_flight.stats())
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """
+    Prometheus scrape endpoint.
+    """
+    cache = conversion_cache.stats()
+
+    counters = {
+        "pdf_cache_hits_total": {(("tier", tier),): hits for tier, hits in cache["hits"].items()},
+        "pdf_cache_misses_total": cache["misses"],
+        "pdf_coalesced_requests_total": single_flight.coalesced,
+    }
+    gauges = {
+        "pdf_cache_memory_bytes": cache["memory_bytes"],
+        "pdf_cache_disk_bytes": cache["disk_bytes"],
+        "pdf_conversions_in_flight": conversion_pool.in_flight,
+        "pdf_coalesced_conversions_in_flight": single_flight.in_flight,
+        "pdf_conversions_running": conversion_pool.running,
+        "pdf_clients_in_flight": client_limiter.clients,
+    }
+    if job_store:
+        gauges["pdf_jobs_queued"] = job_store.queued()
+        gauges["pdf_jobs_running"] = job_store.running
+
+    return REGISTRY.render(gauges, counters)
+
+
+@app.post("/jobs", status_code=202)
+async def submit_job(request: Request, file: UploadFile = File(...)):
+    if job_store is None:
+        return JSONResponse({"error": "Job API is not available"}, status_code=503)
+
+    pdf_content = await file.read()
+
+    try:
+        estimate = await asyncio.to_thread(preflight, pdf_content)
+        return await asyncio.to_thread(job_store.submit, pdf_content, file.filename, estimate, client_id(request))
+    except PoolBusyError as e:
+        REGISTRY.inc("pdf_rejected_total", reason="busy")
+        return JSONResponse({"error": str(e)}, status_code=503, headers={"Retry-After": "5"})
+    except (JobTooLargeError, ClientBusyError, InvalidPdfError) as e:
+        return rejection_response(e)
+
+
+@app.get("/jobs/{job_id}")
+def job_status(job_id: str):
+    status = job_store.status(job_id) if job_store else None
+    if status is None:
+        return JSONResponse({"error": "Job not found"}, status_code=404)
+
+    return status
+
+
+@app.get("/jobs/{job_id}/result")
+def job_result(job_id: str):
+    status = job_store.status(job_id) if job_store else None
+    if status is None:
+        return JSONResponse({"error": "Job not found"}, status_code=404)
+
+    if status["status"] == "failed":
+        return JSONResponse({"error": status["error"]}, status_code=500)
+
+    if status["status"] != "done":
+        return JSONResponse({"error": "Job is not finished", "status": status["status"]}, status_code=409)
+
+    return FileResponse(
+        job_store.result_path(job_id),
+        media_type=DOCX_MEDIA_TYPE,
+        filename=download_name(status["filename"], ".docx")
+    )
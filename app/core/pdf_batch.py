@@ -0,0 +1,217 @@
+import argparse
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from app.core.pdf_pipeline import run_pipeline
+from app.core.pdf_worker import process_context
+
+
+REPORT_NAME = "batch_report.jsonl"
+
+# Seconds one file may take before its worker is killed (0 = no limit)
+FILE_TIMEOUT = float(os.getenv("PDF_BATCH_FILE_TIMEOUT", "600"))
+
+
+def convert_file(pdf_path: str, output_path: str) -> dict:
+    """
+    Converts one PDF on disk to a DOCX on disk.
+    Never raises, failures are returned in the report entry instead.
+    """
+    started = time.time()
+
+    try:
+        with open(pdf_path, "rb") as f:
+            result = run_pipeline(f.read())
+
+        os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+
+        # Write then rename, so an interrupted run never leaves a
+        # half-written file that resume would treat as done
+        tmp_path = output_path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(result["docx"])
+        os.replace(tmp_path, output_path)
+
+        status, error = "ok", None
+    except Exception as e:
+        status, error = "error", f"{type(e).__name__}: {e}"
+
+    return {
+        "file": pdf_path,
+        "output": output_path,
+        "status": status,
+        "error": error,
+        "seconds": round(time.time() - started, 3)
+    }
+
+
+def find_pdfs(input_dir: str):
+    """
+    Yields (pdf_path, relative_path) for every PDF below input_dir.
+    """
+    for root, _, files in os.walk(input_dir):
+        for name in sorted(files):
+            if name.lower().endswith(".pdf"):
+                pdf_path = os.path.join(root, name)
+                yield pdf_path, os.path.relpath(pdf_path, input_dir)
+
+
+def is_converted(pdf_path: str, output_path: str) -> bool:
+    return (
+        os.path.exists(output_path)
+        and os.path.getmtime(output_path) >= os.path.getmtime(pdf_path)
+    )
+
+
+def failed_entry(pdf_path: str, output_path: str, error: str, seconds: float) -> dict:
+    return {
+        "file": pdf_path,
+        "output": output_path,
+        "status": "error",
+        "error": error,
+        "seconds": round(seconds, 3)
+    }
+
+
+def stop_pool(pool: ProcessPoolExecutor):
+    """
+    Shuts a pool down without waiting for its running files: a hung
+    worker would block shutdown forever, so its processes are killed.
+    """
+    processes = list((pool._processes or {}).values())
+    pool.shutdown(wait=False, cancel_futures=True)
+    for process in processes:
+        process.kill()
+
+
+def convert_directory(input_dir: str, output_dir: str, workers: int = None, resume: bool = True,
+                      timeout: float = FILE_TIMEOUT) -> dict:
+    """
+    Converts every PDF below input_dir into output_dir (same relative layout).
+
+    - Runs files in a process pool, one file per worker at a time
+    - A file that runs longer than timeout seconds is recorded as failed
+      and its worker is killed
+    - A worker that dies (crash, OOM kill) breaks the pool: a new pool is
+      started, and the files that were running are retried one at a time
+      so only the file that killed its worker is recorded as failed
+    - With resume, files whose DOCX is already newer than the PDF are skipped,
+      so a restarted run continues where the previous one stopped
+    - Every finished file is appended to output_dir/batch_report.jsonl
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    report_path = os.path.join(output_dir, REPORT_NAME)
+    workers = workers or os.cpu_count() or 1
+
+    jobs = []
+    skipped = 0
+
+    for pdf_path, relative_path in find_pdfs(input_dir):
+        output_path = os.path.join(output_dir, os.path.splitext(relative_path)[0] + ".docx")
+
+        if resume and is_converted(pdf_path, output_path):
+            skipped += 1
+            continue
+
+        jobs.append((pdf_path, output_path))
+
+    summary = {"converted": 0, "failed": 0, "skipped": skipped}
+    started = time.time()
+
+    # (pdf_path, output_path, suspect): suspects were running when a worker
+    # died, they run alone until it is clear which of them killed it
+    queue = deque((pdf_path, output_path, False) for pdf_path, output_path in jobs)
+
+    with open(report_path, "a", encoding="utf-8") as report:
+        def record(entry):
+            report.write(json.dumps(entry) + "\n")
+            report.flush()
+
+            if entry["status"] == "ok":
+                summary["converted"] += 1
+            else:
+                summary["failed"] += 1
+                print(f"FAILED {entry['file']}: {entry['error']}")
+
+        while queue:
+            pool = ProcessPoolExecutor(max_workers=workers, mp_context=process_context())
+            running = {}  # future -> (job, start time)
+            crashed = timed_out = False
+
+            try:
+                while (queue or running) and not (crashed or timed_out):
+                    while queue and len(running) < workers:
+                        # A suspect only runs on an otherwise idle pool
+                        if running and (queue[0][2] or any(job[2] for job, _ in running.values())):
+                            break
+                        job = queue.popleft()
+                        running[pool.submit(convert_file, job[0], job[1])] = (job, time.monotonic())
+
+                    wait_for = None
+                    if timeout:
+                        wait_for = max(0.0, min(t for _, t in running.values()) + timeout - time.monotonic())
+                    done, _ = wait(running, timeout=wait_for, return_when=FIRST_COMPLETED)
+
+                    for future in done:
+                        job, job_started = running.pop(future)
+                        try:
+                            record(future.result())
+                        except BrokenProcessPool:
+                            crashed = True
+                            if job[2]:
+                                record(failed_entry(job[0], job[1], "BrokenProcessPool: worker process died",
+                                                    time.monotonic() - job_started))
+                            else:
+                                queue.appendleft((job[0], job[1], True))
+
+                    for future, (job, job_started) in list(running.items()):
+                        if timeout and time.monotonic() - job_started >= timeout:
+                            del running[future]
+                            timed_out = True
+                            record(failed_entry(job[0], job[1], f"TimeoutError: exceeded {timeout:g}s",
+                                                time.monotonic() - job_started))
+            finally:
+                # Files still running when the pool is torn down start over in
+                # the next one, as suspects when a worker died under them
+                for job, _ in running.values():
+                    queue.appendleft((job[0], job[1], job[2] or crashed))
+                if crashed or timed_out:
+                    stop_pool(pool)
+                else:
+                    pool.shutdown()
+
+    elapsed = time.time() - started
+    summary["seconds"] = round(elapsed, 3)
+    summary["files_per_minute"] = round(len(jobs) / elapsed * 60, 1) if elapsed > 0 else 0.0
+    summary["report"] = report_path
+
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert a directory of PDFs to Word documents.")
+    parser.add_argument("input_dir", help="directory containing PDF files (searched recursively)")
+    parser.add_argument("output_dir", help="directory for the generated DOCX files")
+    parser.add_argument("--workers", type=int, default=None, help="number of worker processes (default: CPU count)")
+    parser.add_argument("--no-resume", action="store_true", help="convert every file even if its DOCX is up to date")
+    parser.add_argument("--timeout", type=float, default=FILE_TIMEOUT,
+                        help=f"seconds one file may take, 0 for no limit (default: {FILE_TIMEOUT:g})")
+    args = parser.parse_args()
+
+    summary = convert_directory(args.input_dir, args.output_dir, args.workers, resume=not args.no_resume,
+                                timeout=args.timeout)
+
+    print(
+        f"Converted {summary['converted']}, failed {summary['failed']}, "
+        f"skipped {summary['skipped']} in {summary['seconds']}s "
+        f"({summary['files_per_minute']} files/min)"
+    )
+    print("Report:", summary["report"])
+
+
+if __name__ == "__main__":
+    main()
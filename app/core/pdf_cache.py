@@ -0,0 +1,242 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+
+# Cache limits (override through environment variables)
+CACHE_MEMORY_BYTES = int(os.getenv("PDF_CACHE_MEMORY_BYTES", str(64 * 1024 * 1024)))
+CACHE_DISK_BYTES = int(os.getenv("PDF_CACHE_DISK_BYTES", str(512 * 1024 * 1024)))
+CACHE_STRUCTURED = os.getenv("PDF_CACHE_STRUCTURED", "1") == "1"
+
+
+def cache_key(pdf_bytes, version: str) -> str:
+    """
+    Content address of a conversion: hash of the PDF bytes plus the
+    pipeline version, so a pipeline change never serves stale output.
+    """
+    digest = hashlib.sha256()
+    digest.update(version.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(pdf_bytes)
+    return digest.hexdigest()
+
+
+class ConversionCache:
+    """
+    Two-tier cache of finished conversions.
+
+    - Memory tier: LRU of DOCX bytes, bounded by total size
+    - Disk tier: <key>.docx (+ <key>.json structured doc, <key>.info.json
+      conversion details) files in cache_dir, oldest-used files are
+      evicted once the directory exceeds its size budget
+
+    Each entry can carry a small info dict about the conversion (e.g. its
+    image-only pages), returned by get_entry.
+    """
+
+    def __init__(self, cache_dir: str, memory_bytes=CACHE_MEMORY_BYTES,
+                 disk_bytes=CACHE_DISK_BYTES, keep_structured=CACHE_STRUCTURED):
+        self.cache_dir = cache_dir
+        self.memory_bytes = memory_bytes
+        self.disk_bytes = disk_bytes
+        self.keep_structured = keep_structured
+
+        self._memory = OrderedDict()
+        self._memory_size = 0
+        self._lock = threading.Lock()
+
+        self.hits = {"memory": 0, "disk": 0}
+        self.misses = 0
+        self.evictions = {"memory": 0, "disk": 0}
+
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            self._disk_enabled = disk_bytes > 0
+        except Exception as e:
+            print(f"Warning: disk cache disabled: {e}")
+            self._disk_enabled = False
+
+        self._disk_size = self._scan_disk_size()
+
+    # -------------------------------------------------
+    # PUBLIC API
+    # -------------------------------------------------
+    def get(self, key: str):
+        """
+        Returns cached DOCX bytes or None.
+        """
+        entry = self.get_entry(key)
+        return entry[0] if entry is not None else None
+
+    def get_entry(self, key: str):
+        """
+        Returns (DOCX bytes, info dict) or None. Entries stored without
+        info have an empty dict.
+        """
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                self.hits["memory"] += 1
+                return entry
+
+        entry = self._read_disk(key)
+
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self.hits["disk"] += 1
+            self._remember(key, *entry)
+            return entry
+
+    def get_structured(self, key: str):
+        """
+        Returns the cached structured document dict or None.
+        """
+        if not self._disk_enabled:
+            return None
+
+        try:
+            with open(self._path(key, ".json"), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def put(self, key: str, docx_bytes: bytes, structured: dict = None, info: dict = None):
+        info = info or {}
+        with self._lock:
+            self._remember(key, docx_bytes, info)
+
+        self._write_disk(key, docx_bytes, structured if self.keep_structured else None, info)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits["memory"] + self.hits["disk"] + self.misses
+            return {
+                "hits": dict(self.hits),
+                "misses": self.misses,
+                "hit_ratio": (lookups - self.misses) / lookups if lookups else 0.0,
+                "evictions": dict(self.evictions),
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_size,
+                "disk_bytes": self._disk_size,
+            }
+
+    # -------------------------------------------------
+    # MEMORY TIER
+    # -------------------------------------------------
+    def _remember(self, key, docx_bytes, info):
+        # Entries larger than the whole budget are only kept on disk
+        if len(docx_bytes) > self.memory_bytes:
+            return
+
+        if key in self._memory:
+            self._memory_size -= len(self._memory.pop(key)[0])
+
+        # Sized by the DOCX alone, the info dict is a few bytes
+        self._memory[key] = (docx_bytes, info)
+        self._memory_size += len(docx_bytes)
+
+        while self._memory_size > self.memory_bytes:
+            _, (evicted, _) = self._memory.popitem(last=False)
+            self._memory_size -= len(evicted)
+            self.evictions["memory"] += 1
+
+    # -------------------------------------------------
+    # DISK TIER
+    # -------------------------------------------------
+    def _path(self, key, suffix):
+        return os.path.join(self.cache_dir, key + suffix)
+
+    def _scan_disk_size(self) -> int:
+        if not self._disk_enabled:
+            return 0
+
+        total = 0
+        for entry in os.scandir(self.cache_dir):
+            if entry.is_file():
+                total += entry.stat().st_size
+        return total
+
+    def _read_disk(self, key):
+        if not self._disk_enabled:
+            return None
+
+        path = self._path(key, ".docx")
+        try:
+            with open(path, "rb") as f:
+                docx_bytes = f.read()
+            # Touch the file so eviction treats it as recently used
+            os.utime(path)
+        except OSError:
+            return None
+
+        try:
+            with open(self._path(key, ".info.json"), "r", encoding="utf-8") as f:
+                info = json.load(f)
+        except (OSError, ValueError):
+            info = {}
+
+        return docx_bytes, info
+
+    def _write_disk(self, key, docx_bytes, structured, info):
+        if not self._disk_enabled:
+            return
+
+        # The info goes first, a visible .docx always has its info next to it
+        files = [(".info.json", json.dumps(info).encode("utf-8"))] if info else []
+        files.append((".docx", docx_bytes))
+        if structured is not None:
+            files.append((".json", json.dumps(structured).encode("utf-8")))
+
+        try:
+            for suffix, payload in files:
+                path = self._path(key, suffix)
+                tmp_path = path + ".tmp"
+
+                previous_size = os.path.getsize(path) if os.path.exists(path) else 0
+
+                with open(tmp_path, "wb") as f:
+                    f.write(payload)
+                # Atomic rename, readers never see half-written files
+                os.replace(tmp_path, path)
+
+                with self._lock:
+                    self._disk_size += len(payload) - previous_size
+        except OSError as e:
+            print(f"Warning: could not write cache entry: {e}")
+            return
+
+        if self._disk_size > self.disk_bytes:
+            self._evict_disk()
+
+    def _evict_disk(self):
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.is_file() and entry.name.endswith(".docx"):
+                entries.append((entry.stat().st_mtime, entry.name[:-len(".docx")]))
+
+        # Oldest used first
+        entries.sort()
+
+        for _, key in entries:
+            if self._disk_size <= self.disk_bytes:
+                break
+
+            for suffix in (".docx", ".json", ".info.json"):
+                path = self._path(key, suffix)
+                try:
+                    size = os.path.getsize(path)
+                    os.remove(path)
+                except OSError:
+                    continue
+
+                with self._lock:
+                    self._disk_size -= size
+
+            with self._lock:
+                self.evictions["disk"] += 1
@@ -0,0 +1,193 @@
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+
+
+# Number of learned font tables kept per process (shared by all requests)
+FONT_TABLE_CACHE_SIZE = int(os.getenv("PDF_CID_FONT_CACHE_SIZE", "256"))
+
+BFCHAR_BLOCK = re.compile(rb"beginbfchar(.*?)endbfchar", re.S)
+BFRANGE_BLOCK = re.compile(rb"beginbfrange(.*?)endbfrange", re.S)
+BFRANGE_ENTRY = re.compile(rb"<([0-9A-Fa-f]+)>\s*<([0-9A-Fa-f]+)>\s*(<[0-9A-Fa-f]*>|\[[^\]]*\])")
+HEX_STRING = re.compile(rb"<([0-9A-Fa-f]*)>")
+
+CID_GLYPH = re.compile(r"\(cid:(\d+)\)")
+
+
+class FontTableCache:
+    """
+    LRU of CID -> text tables, keyed by font fingerprint.
+
+    Tables parsed from a ToUnicode map are keyed by the hashes of the
+    embedded font program and of the map, so a document that embeds the
+    same program with another map gets its own table. Each table is also
+    stored under the program hash alone, the table used for a later
+    document that embeds the identical font without a ToUnicode map.
+    """
+
+    def __init__(self, max_size=FONT_TABLE_CACHE_SIZE):
+        self.max_size = max_size
+        self._tables = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            table = self._tables.get(key)
+            if table is not None:
+                self._tables.move_to_end(key)
+            return table
+
+    def put(self, key: str, table: dict):
+        with self._lock:
+            self._tables[key] = table
+            self._tables.move_to_end(key)
+            while len(self._tables) > self.max_size:
+                self._tables.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._tables.clear()
+
+    def __len__(self):
+        return len(self._tables)
+
+
+FONT_TABLES = FontTableCache()
+
+
+def _hex_text(value: bytes) -> str:
+    raw = bytes.fromhex(value.decode("ascii"))
+    return raw.decode("utf-16-be", errors="ignore")
+
+
+def parse_to_unicode(data: bytes) -> dict:
+    """
+    Parses the bfchar and bfrange sections of a ToUnicode CMap into
+    {cid: text}.
+    """
+    table = {}
+
+    for block in BFCHAR_BLOCK.findall(data):
+        values = HEX_STRING.findall(block)
+        for source, target in zip(values[0::2], values[1::2]):
+            if source:
+                table[int(source, 16)] = _hex_text(target)
+
+    for block in BFRANGE_BLOCK.findall(data):
+        for low, high, target in BFRANGE_ENTRY.findall(block):
+            low, high = int(low, 16), int(high, 16)
+
+            if target.startswith(b"["):
+                # <low> <high> [<text> <text> ...]: one entry per code
+                for offset, value in enumerate(HEX_STRING.findall(target)):
+                    table[low + offset] = _hex_text(value)
+                continue
+
+            # <low> <high> <text>: the last character counts up with the code
+            start = _hex_text(target[1:-1])
+            if not start:
+                continue
+            prefix, last = start[:-1], ord(start[-1])
+            for offset in range(min(high - low, 0xFFFF) + 1):
+                table[low + offset] = prefix + chr(last + offset)
+
+    return table
+
+
+def _program_key(doc, xref: int):
+    try:
+        program = doc.extract_font(xref)[3]
+    except Exception:
+        program = b""
+
+    return hashlib.sha1(program).hexdigest() if program else None
+
+
+def _to_unicode_xref(doc, xref: int):
+    kind, value = doc.xref_get_key(xref, "ToUnicode")
+    return int(value.split()[0]) if kind == "xref" else None
+
+
+def font_table(doc, xref: int):
+    """
+    CID table for one font of an open PyMuPDF document, or None.
+
+    Fonts with a ToUnicode map use that map (parsed once per font
+    program and map, later documents hit the cache). Fonts without one
+    get the table learned from an earlier document that embedded the
+    same font program.
+    """
+    program_key = _program_key(doc, xref)
+
+    map_xref = _to_unicode_xref(doc, xref)
+    if map_xref is None:
+        return FONT_TABLES.get(program_key) if program_key else None
+
+    data = doc.xref_stream(map_xref) or b""
+    key = f"{program_key}:{hashlib.sha1(data).hexdigest()}"
+
+    table = FONT_TABLES.get(key)
+    if table is None:
+        table = parse_to_unicode(data)
+        FONT_TABLES.put(key, table)
+
+    if program_key:
+        # Fallback for copies of this font whose map was stripped
+        FONT_TABLES.put(program_key, table)
+    return table
+
+
+def learn_mapped_fonts(doc, fonts, seen: set) -> int:
+    """
+    Caches the tables of the embedded fonts with a ToUnicode map among
+    fonts (page.get_fonts() of one page), during normal extraction, so
+    later documents with the same fonts but no maps can be resolved.
+    seen: font xrefs of this document already handled, updated in place.
+    Returns the number of fonts looked at.
+    """
+    learned = 0
+
+    for xref, *_ in fonts:
+        if not xref or xref in seen:
+            continue
+        seen.add(xref)
+
+        if _to_unicode_xref(doc, xref) is not None and font_table(doc, xref) is not None:
+            learned += 1
+
+    return learned
+
+
+def learn_font_tables(doc) -> dict:
+    """
+    Returns {font name: CID table} for every font in the document that
+    has a ToUnicode map, or whose font program was seen before. Names
+    are the BaseFont names pdfminer reports for each glyph.
+    """
+    tables = {}
+    seen = set()
+
+    for page in doc:
+        for xref, _, _, basefont, _, _ in page.get_fonts():
+            if xref in seen:
+                continue
+            seen.add(xref)
+
+            table = font_table(doc, xref)
+            if table:
+                tables.setdefault(basefont, table)
+
+    return tables
+
+
+def resolve_cid_glyph(glyph: str, table: dict) -> str:
+    """
+    Text for one "(cid:NN)" glyph from a font table. Unknown glyphs are
+    returned unchanged, so normalize_cid can still apply CID_MAP.
+    """
+    match = CID_GLYPH.fullmatch(glyph)
+    if not match or not table:
+        return glyph
+    return table.get(int(match.group(1)), glyph)
@@ -1,25 +1,72 @@
-def normalize_lines(text: str):
+import re
+import string
+from functools import lru_cache
+from itertools import islice
 
-   
-    normalized_lines = []
+from app.core.pdf_metrics import stage
 
-   
-    for raw_line in text.split("\n"):
 
-  
-        line = raw_line.strip()
+# Control characters are not allowed in Word XML (broken font encodings produce them)
+CONTROL_CHARS = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
 
+# Heading heuristics
+HEADING_MAX_LENGTH = 50
+HEADING_MIN_UPPERCASE_RATIO = 0.7
 
-        if not line:
+# The title is searched for in this many lines at the top of the document
+TITLE_SEARCH_LINES = 5
+
+# Letter tables for counting ASCII lines with bytes.translate
+ASCII_LETTERS = string.ascii_letters.encode("ascii")
+ASCII_UPPERCASE = string.ascii_uppercase.encode("ascii")
+
+# Distinct lines whose features are remembered (repeated headers, footers, labels)
+FEATURE_CACHE_SIZE = 65536
+
+# Lines DocumentStructurer.feed normalizes and classifies at a time
+CLASSIFY_BATCH_SIZE = 1024
+
+
+def iter_normalized_lines(raw_lines):
+    """
+    Lazily normalizes lines one at a time, so callers can stream
+    pages through without building the whole document first.
+    Tables (lists of rows, see pdf_extract.iter_text_lines) are
+    passed through as they are.
+    """
+    for raw_line in raw_lines:
+        if isinstance(raw_line, list):
+            yield raw_line
             continue
 
+        # split() also strips, empty lines give no words
+        words = CONTROL_CHARS.sub(" ", raw_line).split()
 
-        line = " ".join(line.split())
+        if not words:
+            continue
 
-   
-        normalized_lines.append(line)
+        yield " ".join(words)
 
-    return normalized_lines
+
+def iter_raw_lines(text: str):
+    """
+    Yields the lines of a text one at a time, without splitting the
+    whole text into a list first.
+    """
+    start = 0
+    end = text.find("\n")
+    while end >= 0:
+        yield text[start:end]
+        start = end + 1
+        end = text.find("\n", start)
+    yield text[start:]
+
+
+def normalize_lines(text: str) -> list[str]:
+    """
+    Returns the non-empty lines of a text with whitespace collapsed.
+    """
+    return list(iter_normalized_lines(iter_raw_lines(text)))
 
 
 def looks_like_sentence(line: str) -> bool:
@@ -41,6 +88,35 @@ def looks_like_sentence(line: str) -> bool:
         return True
 
     return False
+
+
+@lru_cache(maxsize=FEATURE_CACHE_SIZE)
+def line_features(line: str) -> tuple:
+    """
+    Returns (length, uppercase_ratio, is_sentence) for a line.
+
+    Letters and uppercase letters are counted in C (bytes.translate for
+    ASCII lines, map over str methods otherwise), without building a
+    per-line list. Results are cached, documents repeat the same headers,
+    footers and form labels many times.
+    """
+    length = len(line)
+    is_sentence = looks_like_sentence(line)
+
+    if line.isascii():
+        encoded = line.encode("ascii")
+        letter_count = length - len(encoded.translate(None, ASCII_LETTERS))
+        uppercase_count = length - len(encoded.translate(None, ASCII_UPPERCASE))
+    else:
+        letter_count = sum(map(str.isalpha, line))
+        uppercase_count = sum(map(str.isupper, line))
+
+    if not letter_count:
+        return length, 0.0, is_sentence
+
+    return length, uppercase_count / letter_count, is_sentence
+
+
 def is_heading(line: str) -> bool:
     """
     Determines whether a line is a heading using structural heuristics.
@@ -51,34 +127,33 @@ def is_heading(line: str) -> bool:
     - Does not look like a sentence
     """
 
-    # Very long lines are unlikely to be headings
-    if len(line) > 50:
+    # Very long lines are unlikely to be headings (checked before any counting)
+    if len(line) > HEADING_MAX_LENGTH:
         return False
 
-    # Extract only alphabetic characters from the line
-    letters = [char for char in line if char.isalpha()]
-
-    # If there are no letters, it cannot be a heading
-    if not letters:
-        return False
-
-    # Calculate ratio of uppercase letters
-    uppercase_count = sum(1 for char in letters if char.isupper())
-    uppercase_ratio = uppercase_count / len(letters)
+    _, uppercase_ratio, is_sentence = line_features(line)
 
     # Headings usually have majority uppercase letters
-    if uppercase_ratio < 0.7:
+    # (lines without letters have a ratio of 0 and are never headings)
+    if uppercase_ratio < HEADING_MIN_UPPERCASE_RATIO:
         return False
 
     # Headings are not full sentences
-    if looks_like_sentence(line):
-        return False
+    return not is_sentence
 
-    return True
 
-def detect_title(lines: list[str]) -> str:
+def classify_lines(lines: list) -> list[bool]:
+    """
+    Batch mode of is_heading: one flag per line, each distinct line is
+    classified only once. Tables (lists of rows) are never headings.
+    """
+    flags = {line: is_heading(line) for line in {line for line in lines if isinstance(line, str)}}
+    return [isinstance(line, str) and flags[line] for line in lines]
+
+
+def detect_title_index(lines: list[str], headings: list[bool] = None) -> int:
     """
-    Detects the document title.
+    Returns the index of the title line, or -1 if there is none.
 
     Strategy:
     - Title appears near the top
@@ -87,72 +162,195 @@ def detect_title(lines: list[str]) -> str:
     """
 
     # Only inspect the first few lines to avoid false positives
-    for line in lines[:5]:
-        if is_heading(line):
-            return line
+    for index, line in enumerate(lines[:TITLE_SEARCH_LINES]):
+        if headings[index] if headings is not None else is_heading(line):
+            return index
 
-    # If no title is detected, return empty string
-    return ""
-def group_content_under_headings(text: str):
+    return -1
+
+
+def detect_title(lines: list[str]) -> str:
     """
-    Groups normalized text lines under detected headings.
+    Detects the document title (empty string if there is none).
+    """
+    index = detect_title_index(lines)
+    return lines[index] if index >= 0 else ""
 
-    Input:
-    - Raw extracted text (string)
 
-    Output:
-    {
-        "title": "DOCUMENT TITLE",
-        "sections": {
-            "HEADING 1": [line1, line2, ...],
-            "HEADING 2": [line1, line2, ...],
+class DocumentStructurer:
+    """
+    Online counterpart of group_content_under_headings.
+
+    Accepts lines (e.g. one page at a time) as they are extracted and
+    returns every section as soon as the next heading closes it, so
+    later stages can render section 1 while later pages are still
+    being read:
+
+        structurer = DocumentStructurer()
+        for page_lines in pages:
+            for heading, lines in structurer.feed(page_lines):
+                ...
+        for heading, lines in structurer.close():
             ...
-        }
-    }
+        structured = structurer.result()
+
+    Only the first TITLE_SEARCH_LINES lines are held back until the
+    title is known. Completed sections are returned in document order;
+    result() keeps the dictionary shape of group_content_under_headings.
     """
 
-    # STEP 1: Normalize raw text into clean lines (STEP 2.1)
-    lines = normalize_lines(text)
+    def __init__(self):
+        self.title = ""
+        self.sections = {}
+
+        self._head = []
+        self._title_index = None
+        self._index = 0
+
+        self._current_heading = None
+        self._current_lines = None
+
+    @property
+    def title_ready(self) -> bool:
+        return self._title_index is not None
+
+    def feed(self, raw_lines) -> list:
+        """
+        Normalizes and adds raw lines, classified CLASSIFY_BATCH_SIZE
+        lines at a time (classify_lines). Returns the (heading, lines)
+        sections they completed.
+        """
+        closed = []
+        lines = iter_normalized_lines(raw_lines)
+
+        while True:
+            batch = list(islice(lines, CLASSIFY_BATCH_SIZE))
+            if not batch:
+                return closed
+            closed.extend(self.add_lines(batch, classify_lines(batch)))
+
+    def add_lines(self, lines, headings: list[bool] = None) -> list:
+        """
+        Adds already normalized lines, optionally with their heading
+        flags from classify_lines. Returns the sections they completed.
+        """
+        closed = []
+        pairs = zip(lines, headings) if headings is not None else ((line, None) for line in lines)
+
+        for line, heading in pairs:
+            if self._title_index is None:
+                # STEP 2.2: hold the first lines back until the title is known
+                self._head.append((line, heading))
+                if len(self._head) >= TITLE_SEARCH_LINES:
+                    self._resolve_title(closed)
+                continue
+
+            self._add(line, heading, closed)
+
+        return closed
+
+    def close(self) -> list:
+        """
+        Ends the document. Returns the remaining sections.
+        """
+        closed = []
+
+        if self._title_index is None:
+            self._resolve_title(closed)
+
+        if self._current_heading is not None:
+            closed.append((self._current_heading, self._current_lines))
+            self._current_heading = None
+
+        return closed
+
+    def result(self) -> dict:
+        return {
+            "title": self.title,
+            "sections": self.sections
+        }
 
-    # STEP 2: Detect document title (STEP 2.2)
-    title = detect_title(lines)
+    def _resolve_title(self, closed):
+        head = self._head
+        self._head = []
 
-    # Dictionary to store sections and their content
-    sections = {}
+        # Tables are never headings (nor the title)
+        flags = [
+            heading if heading is not None else isinstance(line, str) and is_heading(line)
+            for line, heading in head
+        ]
+        self._title_index = detect_title_index([line for line, _ in head], flags)
 
-    # Keeps track of which section we are currently inside
-    current_heading = None
+        for (line, _), heading in zip(head, flags):
+            self._add(line, heading, closed)
 
-    # Iterate through each line in order
-    for line in lines:
+    def _add(self, line, heading, closed):
+        index = self._index
+        self._index += 1
 
         # Skip the title line so it is not treated as a section
-        if line == title:
-            continue
-
-        # Check if the current line is a heading
-        if is_heading(line):
+        # (by position, body lines with the same text are kept)
+        if index == self._title_index:
+            self.title = line
+            return
+
+        if isinstance(line, list):
+            # Tables belong to the current section like any other content
+            if self._current_heading is not None:
+                self._current_lines.append(line)
+            return
+
+        if heading is None:
+            heading = is_heading(line)
+
+        if heading:
+            # A new heading closes the current section
+            if self._current_heading is not None:
+                closed.append((self._current_heading, self._current_lines))
+
+            self._current_heading = line
+            self._current_lines = []
+            self.sections[line] = self._current_lines
+            return
+
+        # Content belongs to the most recent heading; lines before the
+        # first heading (metadata like Name, Email, etc.) are ignored
+        if self._current_heading is not None:
+            self._current_lines.append(line)
+
+
+@stage("structure")
+def group_content_under_headings(text):
+    """
+    Groups normalized text lines under detected headings.
 
-            # When a new heading is found, create a new section
-            current_heading = line
+    Input:
+    - Raw extracted text (string), or any iterable of raw lines (e.g. a
+      generator over extracted pages). Both are consumed lazily, one
+      line at a time
 
-            # Initialize an empty list to store content for this heading
-            sections[current_heading] = []
+    Output:
+    {
+        "title": "DOCUMENT TITLE",
+        "sections": {
+            "HEADING 1": [line1, line2, ...],
+            "HEADING 2": [line1, [[cell, ...], ...], line3, ...],
+            ...
+        }
+    }
 
-            # Move to next line (content will be added later)
-            continue
+    Tables in the input (lines given as lists of rows) stay at their
+    position in their section.
+    """
+    structurer = DocumentStructurer()
 
-        # If the line is not a heading, it is content
-        # Content must belong to the most recent heading
-        if current_heading:
-            sections[current_heading].append(line)
+    # STEP 1: Normalize raw text into clean lines (STEP 2.1)
+    if isinstance(text, str):
+        # Streamed like any other input, no list of lines is built
+        text = iter_raw_lines(text)
+    structurer.feed(text)
 
-        # If no heading has been detected yet,
-        # we safely ignore the line (metadata like Name, Email, etc.)
-        # This avoids wrongly grouping header info into sections
+    structurer.close()
 
     # Return the structured document
-    return {
-        "title": title,
-        "sections": sections
-    }
+    return structurer.result()
@@ -1,90 +1,458 @@
 import pdfplumber
-from typing import List, Dict
+from typing import List, Dict, Union, BinaryIO
 import fitz
+import os
 import re
+from io import BytesIO
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from contextlib import ExitStack, contextmanager
 from pdfminer.high_level import extract_text as pdfminer_extract_text
+from pdfminer.high_level import extract_pages as pdfminer_extract_pages
+from pdfminer.layout import LTChar, LTTextContainer, LTTextLine
 
+from app.core.pdf_cid import CID_GLYPH, learn_font_tables, learn_mapped_fonts, resolve_cid_glyph
+from app.core.pdf_layout import analyze_page_layout, infer_alignment
+from app.core.pdf_lines import TextLine, as_text_line, line_text
+from app.core.pdf_metrics import collect_stages, count, merge_stages, stage
+from app.core.pdf_ocr import ocr_page_lines
+from app.core.pdf_page_cache import PAGE_CACHE, PageFingerprinter
+from app.core.pdf_worker import POOL_WORKERS, process_context
 
-# Alignment of text based on x-coordinate of pdf
-def infer_alignment(x: float, page_width: float) -> str:
-    center_left = page_width * 0.4
-    center_right = page_width * 0.6
-    right_threshold = page_width * 0.75
 
-    if center_left <= x <= center_right:
-        return "center"
-    if x >= right_threshold:
-        return "right"
-    return "left"
+# A PDF can be given as a path, raw bytes or a binary file object
+PdfSource = Union[str, bytes, bytearray, memoryview, BinaryIO]
 
+# Page-parallel extraction settings (override through environment variables)
+PARALLEL_EXTRACTION = os.getenv("PDF_PARALLEL_EXTRACTION", "1") == "1"
+PARALLEL_PAGE_THRESHOLD = int(os.getenv("PDF_PARALLEL_PAGE_THRESHOLD", "200"))  # below this, run serially
+PARALLEL_SHARD_SIZE = int(os.getenv("PDF_PARALLEL_SHARD_SIZE", "50"))            # pages per worker task
+# Up to PDF_POOL_WORKERS conversions run at once, each one gets its share of the CPUs
+PARALLEL_WORKERS = int(os.getenv("PDF_PARALLEL_WORKERS", str(max(1, (os.cpu_count() or 1) // max(1, POOL_WORKERS)))))
 
-def extract_text_from_pdf(pdf_path: str) -> List[Dict]:
-    extracted_pages = []
+# Backend selection (override through environment variables)
+# "adaptive": pre-scan the first pages and run a single primary backend for the rest
+# "compare":  run PyMuPDF and pdfplumber over every page and keep the one with more words
+EXTRACTION_MODE = os.getenv("PDF_EXTRACTION_MODE", "adaptive")
+PRESCAN_PAGES = int(os.getenv("PDF_PRESCAN_PAGES", "3"))
+# PyMuPDF stays primary while it finds at least this share of pdfplumber's words
+PYMUPDF_MIN_WORD_RATIO = 0.9
+# Compare mode reads the document in steps of COMPARE_SHARD_SIZE pages with
+# both backends side by side, steps double up to PARALLEL_SHARD_SIZE. Once both have read COMPARE_DECIDE_PAGES pages
+# and one leads by more than COMPARE_DECIDE_MARGIN of the other's words, the
+# other backend stops (0 = both always read the whole document)
+COMPARE_SHARD_SIZE = int(os.getenv("PDF_COMPARE_SHARD_SIZE", "10"))
+COMPARE_DECIDE_PAGES = int(os.getenv("PDF_COMPARE_DECIDE_PAGES", "20"))
+COMPARE_DECIDE_MARGIN = 0.1
 
-    with pdfplumber.open(pdf_path) as pdf:
-        for index, page in enumerate(pdf.pages):
-            text = page.extract_text()
-            lines = [line.strip() for line in text.split("\n") if line.strip()] if text else []
+# Table extraction (override through environment variables)
+# Pages are only handed to pdfplumber's table finder when their vector
+# drawings contain a grid of ruling lines
+TABLE_EXTRACTION = os.getenv("PDF_TABLE_EXTRACTION", "1") == "1"
+RULING_MIN_LENGTH = 10      # pt, shorter strokes are glyph parts or bullets
+RULING_MAX_THICKNESS = 2    # pt, thin filled rectangles are drawn rules too
+RULING_MIN_HORIZONTAL = 3   # two rows need three horizontal rules
+RULING_MIN_VERTICAL = 2
+# Anything smaller than this is a framed box, not a table
+TABLE_MIN_ROWS = 2
+TABLE_MIN_COLUMNS = 2
 
-            extracted_pages.append({
-                "page_number": index + 1,
+# Scanned page detection: a page with at most this many text lines whose
+# images cover at least this share of it is image-only, the text backends
+# are skipped for it (a page number or stamp over a scan is allowed)
+IMAGE_PAGE_MAX_LINES = 2
+IMAGE_PAGE_MIN_COVERAGE = 0.5
+
+
+def open_pymupdf(source: PdfSource):
+    """
+    Opens a PyMuPDF document from a path or from memory, without temp files.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        return fitz.open(source)
+
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return fitz.open(stream=source, filetype="pdf")
+
+    source.seek(0)
+    return fitz.open(stream=source.read(), filetype="pdf")
+
+
+def pdf_page_count(source: PdfSource) -> int:
+    """
+    Cheap page count, PyMuPDF only reads the page tree for this.
+    """
+    with open_pymupdf(source) as doc:
+        return doc.page_count
+
+
+def as_pdf_stream(source: PdfSource):
+    """
+    Returns something pdfplumber and pdfminer can open:
+    paths are passed through, in-memory data becomes a seekable stream.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        return source
+
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return BytesIO(source)
+
+    source.seek(0)
+    return source
+
+
+@contextmanager
+def page_fingerprints(source: PdfSource, doc=None):
+    """
+    Yields fingerprint(page_index) for the page cache, which returns
+    None when the cache is disabled. doc: the document when the caller
+    already has it open in PyMuPDF.
+    """
+    if not PAGE_CACHE.enabled:
+        yield lambda page_index: None
+        return
+
+    with ExitStack() as stack:
+        if doc is None:
+            doc = stack.enter_context(open_pymupdf(source))
+        fingerprinter = PageFingerprinter(doc)
+        yield lambda page_index: fingerprinter.fingerprint(doc[page_index])
+
+
+def cached_page(key, page_number: int):
+    """
+    Copy of a cached page record for this document's page number, or None.
+    """
+    if key[-1] is None:
+        return None
+
+    record = PAGE_CACHE.get(key)
+    if record is None:
+        count("page_cache_misses")
+        return None
+
+    count("page_cache_hits")
+    return dict(record, page_number=page_number, lines=list(record["lines"]))
+
+
+def cache_page(key, record):
+    # Scans are not cached, whether they get text depends on the OCR engine
+    if key[-1] is not None and not record.get("image_only"):
+        PAGE_CACHE.put(key, dict(record, lines=list(record["lines"])))
+
+
+# Text extraction flags for PyMuPDF: the defaults of get_text("dict") minus
+# image blocks, which would decode every embedded image (scans, logos)
+PYMUPDF_TEXT_FLAGS = fitz.TEXTFLAGS_DICT & ~fitz.TEXT_PRESERVE_IMAGES
+
+
+def iter_pdfplumber_pages(source: PdfSource, start: int, stop: int):
+    """
+    Yields plain text lines for pages [start, stop) (0-based) with pdfplumber.
+    Unchanged pages come from the page cache.
+    """
+    with pdfplumber.open(as_pdf_stream(source), pages=list(range(start + 1, stop + 1))) as pdf, \
+            page_fingerprints(source) as fingerprint:
+        for page in pdf.pages:
+            key = ("pdfplumber-text", fingerprint(page.page_number - 1))
+            cached = cached_page(key, page.page_number)
+            if cached is not None:
+                yield cached
+                continue
+
+            with stage("pdfplumber"):
+                text = page.extract_text()
+                lines = [line.strip() for line in text.split("\n") if line.strip()] if text else []
+
+                # Drop pdfplumber's cached chars/objects for this page
+                page.close()
+
+            record = {
+                "page_number": page.page_number,
                 "lines": lines
-            })
+            }
+            cache_page(key, record)
+
+            yield record
+
 
-    return extracted_pages
+def extract_text_from_pdf(source: PdfSource) -> List[Dict]:
+    return list(iter_page_ranges(source, iter_pdfplumber_pages, pdf_page_count(source)))
 
 
-def extract_text_pymupdf(pdf_path: str):
-    doc = fitz.open(pdf_path)
-    extracted_pages = []
+def pymupdf_page_lines(page) -> List[TextLine]:
+    """
+    Returns alignment-aware lines for a single PyMuPDF page, in reading order.
+    """
+    page_width = page.rect.width
+    blocks = page.get_text("dict", flags=PYMUPDF_TEXT_FLAGS)["blocks"]
+    lines = []
+
+    for block in blocks:
+        if "lines" not in block:
+            continue
 
-    for page_index, page in enumerate(doc):
-        page_width = page.rect.width
-        blocks = page.get_text("dict")["blocks"]
-        lines = []
+        for line in block["lines"]:
+            spans = line["spans"]
+            if not spans:
+                continue
 
-        for block in blocks:
-            if "lines" not in block:
+            cleaned = "".join(span["text"] for span in spans).strip()
+            if not cleaned:
                 continue
 
-            for line in block["lines"]:
-                text = ""
-                x_positions = []
+            x0, y0, x1, _ = line["bbox"]
 
-                for span in line["spans"]:
-                    text += span["text"]
-                    x_positions.append(span["bbox"][0])
+            lines.append(TextLine(cleaned, "left", x0, y0, max(span["size"] for span in spans), x1))
 
-                cleaned = text.strip()
-                if not cleaned:
-                    continue
+    # Alignment and reading order are decided for the whole page at once
+    return analyze_page_layout(lines, page_width)
 
-                avg_x = sum(x_positions) / len(x_positions)
 
-                lines.append({
-                    "text": cleaned,
-                    "alignment": infer_alignment(avg_x, page_width),
-                    "x": avg_x,
-                    "page_width": page_width
-                })
+def is_ruled(horizontal: int, vertical: int) -> bool:
+    return horizontal >= RULING_MIN_HORIZONTAL and vertical >= RULING_MIN_VERTICAL
+
+
+def pymupdf_has_rulings(page) -> bool:
+    """
+    True when the page's vector drawings contain enough horizontal and
+    vertical ruling lines to form a table grid. Only counts strokes,
+    no table structure is built.
+    """
+    horizontal = vertical = 0
+
+    # get_cdrawings: same paths as get_drawings, as plain tuples (much cheaper)
+    for path in page.get_cdrawings():
+        for item in path["items"]:
+            if item[0] == "l":
+                (x0, y0), (x1, y1) = item[1], item[2]
+            elif item[0] == "re":
+                x0, y0, x1, y1 = item[1]
+            else:
+                continue
+
+            width, height = abs(x1 - x0), abs(y1 - y0)
+
+            if height <= RULING_MAX_THICKNESS and width >= RULING_MIN_LENGTH:
+                horizontal += 1
+            elif width <= RULING_MAX_THICKNESS and height >= RULING_MIN_LENGTH:
+                vertical += 1
+            elif item[0] == "re" and "s" in path["type"]:
+                # Stroked rectangle: a cell or a frame, all four edges are rules
+                horizontal += 2
+                vertical += 2
+
+        if is_ruled(horizontal, vertical):
+            return True
+
+    return False
+
+
+def image_coverage(boxes, page_width: float, page_height: float) -> float:
+    """
+    Share of the page covered by image boxes (x0, y0, x1, y1), at most 1.
+    Overlapping images are not subtracted, a full-page scan is enough.
+    """
+    area = 0.0
+    for x0, y0, x1, y1 in boxes:
+        width = min(x1, page_width) - max(x0, 0)
+        height = min(y1, page_height) - max(y0, 0)
+        if width > 0 and height > 0:
+            area += width * height
+
+    return min(1.0, area / (page_width * page_height)) if page_width and page_height else 0.0
+
+
+def is_image_only(lines, coverage) -> bool:
+    return len(lines) <= IMAGE_PAGE_MAX_LINES and coverage() >= IMAGE_PAGE_MIN_COVERAGE
+
+
+def iter_pymupdf_pages(source: PdfSource, start: int, stop: int, include_tables: bool = False):
+    """
+    Yields alignment-aware lines for pages [start, stop) (0-based) with PyMuPDF.
+    With include_tables, pages are flagged ("ruled") when their drawings
+    look like a table, see with_tables.
+
+    Every page is classified up front: a page without fonts has no text
+    to extract, and a page with (almost) no text lines that is mostly
+    covered by images is a scan ("image_only"). Image-only pages go to
+    the OCR hook (pdf_ocr) instead of the other text backends.
+
+    Pages whose fingerprint is in the page cache are not extracted again.
+    The CID tables of fonts with a ToUnicode map are cached on the way
+    (pdf_cid.learn_mapped_fonts), for later documents that embed the
+    same fonts without one.
+    """
+    seen_fonts = set()
+
+    with open_pymupdf(source) as doc, page_fingerprints(source, doc) as fingerprint:
+        for page_index in range(start, stop):
+            with stage("pymupdf"):
+                page_fingerprint = fingerprint(page_index)
+                key = ("pymupdf", include_tables, page_fingerprint)
+                cached = cached_page(key, page_index + 1)
+
+            # Yielded outside the stage, the consumer's time is not extraction
+            if cached is not None:
+                yield cached
+                continue
+
+            with stage("pymupdf"):
+                page = doc[page_index]
+                rect = page.rect
+
+                # Scans have no fonts at all, their text extraction is skipped
+                fonts = page.get_fonts()
+                lines = pymupdf_page_lines(page) if fonts else []
+                mapped_fonts = learn_mapped_fonts(doc, fonts, seen_fonts)
+                if mapped_fonts:
+                    count("cid_fonts_mapped", mapped_fonts)
+
+                # Image boxes are only looked up for pages with (almost) no text
+                image_only = is_image_only(lines, lambda: image_coverage(
+                    (info["bbox"] for info in page.get_image_info()), rect.width, rect.height
+                ))
+
+                record = {
+                    "page_number": page_index + 1,
+                    "lines": lines,
+                    "width": rect.width,
+                    "source": "pymupdf",
+                    "image_only": image_only,
+                    "fingerprint": page_fingerprint
+                }
+
+                if include_tables and not image_only:
+                    record["ruled"] = pymupdf_has_rulings(page)
+
+                cache_page(key, record)
+
+            if image_only:
+                with stage("ocr"):
+                    ocr_lines = ocr_page_lines(page)
+                if ocr_lines:
+                    count("ocr_pages")
+                    record["lines"] = analyze_page_layout(lines + ocr_lines, rect.width)
+                    record["source"] = "ocr"
+
+            yield record
+
+
+def extract_text_pymupdf(source: PdfSource):
+    return list(iter_page_ranges(source, iter_pymupdf_pages, pdf_page_count(source)))
+
+
+# -------------------------------------------------
+# PAGE-PARALLEL EXTRACTION
+# -------------------------------------------------
+# Each worker process receives the PDF once (through the initializer)
+# and opens its own document handle for every shard it is given.
+_shard_source = None
 
-        extracted_pages.append({
-            "page_number": page_index + 1,
-            "lines": lines
-        })
 
-    return extracted_pages
+def _init_shard_worker(source):
+    global _shard_source
+    _shard_source = source
 
-def extract_tables_pdfplumber(pdf_path: str):
+    # Shard pools live for one document, a page cache would die with them
+    # unused: skip fingerprinting and caching in their workers
+    PAGE_CACHE.max_size = 0
+
+
+def _run_shard(iter_fn, start, stop, args):
+    # Stage timings are collected in the worker and merged by the parent
+    with collect_stages() as collector:
+        pages = list(iter_fn(_shard_source, start, stop, *args))
+    return pages, collector.timings, collector.counters
+
+
+def shard_pool(workers: int, source) -> ProcessPoolExecutor:
+    """
+    Process pool for page shards of one document, started like the
+    conversion pool's workers (see pdf_worker.process_context).
+    """
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=process_context(),
+        initializer=_init_shard_worker,
+        initargs=(source,)
+    )
+
+
+def _picklable_source(source: PdfSource):
+    if isinstance(source, (str, bytes)):
+        return source
+    if isinstance(source, os.PathLike):
+        return os.fspath(source)
+    if isinstance(source, (bytearray, memoryview)):
+        return bytes(source)
+
+    source.seek(0)
+    return source.read()
+
+
+def iter_page_ranges(source: PdfSource, iter_fn, page_count: int, *args,
+                     start: int = 0, shard_size: int = None, workers: int = None,
+                     threshold: int = None):
+    """
+    Yields the pages produced by iter_fn(source, start, stop, *args)
+    for pages [start, page_count) of the document.
+
+    Documents with at least `threshold` pages are split into shards of
+    `shard_size` pages that run in separate processes, smaller ones run
+    serially in the calling process. Pages are always yielded in order,
+    and only a few shards are in flight at once so memory stays bounded.
+    """
+    shard_size = max(1, shard_size or PARALLEL_SHARD_SIZE)
+    workers = workers or PARALLEL_WORKERS
+    threshold = PARALLEL_PAGE_THRESHOLD if threshold is None else threshold
+
+    shards = [(first, min(first + shard_size, page_count)) for first in range(start, page_count, shard_size)]
+
+    if not PARALLEL_EXTRACTION or page_count - start < threshold or workers < 2 or len(shards) < 2:
+        yield from iter_fn(source, start, page_count, *args)
+        return
+
+    workers = min(workers, len(shards))
+
+    try:
+        pool = shard_pool(workers, _picklable_source(source))
+    except (OSError, NotImplementedError) as e:
+        # No process support in this environment, fall back to serial
+        print(f"Warning: parallel extraction unavailable ({e}), running serially")
+        yield from iter_fn(source, start, page_count, *args)
+        return
+
+    with pool:
+        pending = deque()
+        remaining = iter(shards)
+
+        # Keep every worker busy plus one shard queued, no more
+        for start, stop in remaining:
+            pending.append(pool.submit(_run_shard, iter_fn, start, stop, args))
+            if len(pending) > workers:
+                break
+
+        while pending:
+            with stage("parallel_wait"):
+                shard_pages, timings, counters = pending.popleft().result()
+            merge_stages(timings, counters)
+
+            next_shard = next(remaining, None)
+            if next_shard is not None:
+                pending.append(pool.submit(_run_shard, iter_fn, next_shard[0], next_shard[1], args))
+
+            yield from shard_pages
+
+
+def extract_tables_pdfplumber(source: PdfSource):
     """
     Extracts table structures from PDF using pdfplumber.
     Returns raw table data per page.
     """
-    import pdfplumber
-
     tables = []
 
-    with pdfplumber.open(pdf_path) as pdf:
+    with pdfplumber.open(as_pdf_stream(source)) as pdf:
         for page_index, page in enumerate(pdf.pages):
             page_tables = page.extract_tables()
 
@@ -96,15 +464,72 @@ def extract_tables_pdfplumber(pdf_path: str):
 
     return tables
 
+
+def clean_cell(cell) -> str:
+    # Cells can be None (merged) or hold wrapped lines
+    return " ".join(normalize_cid(cell).split()) if cell else ""
+
+
+def pdfplumber_page_tables(page) -> List[Dict]:
+    """
+    Tables of a single pdfplumber page: [{"rows", "bbox"}, ...].
+    Rows are lists of cleaned cell texts, empty rows are dropped.
+    """
+    tables = []
+
+    for found in page.find_tables():
+        rows = [[clean_cell(cell) for cell in row] for row in found.extract()]
+        rows = [row for row in rows if any(row)]
+
+        if len(rows) >= TABLE_MIN_ROWS and max(map(len, rows)) >= TABLE_MIN_COLUMNS:
+            tables.append({"rows": rows, "bbox": found.bbox})
+
+    return tables
+
+
+def place_tables(page, tables):
+    """
+    Puts the tables of a page at their position in its lines.
+
+    Lines inside a table's box are the table's own cell text and are
+    removed. Each table gets the index of the line it is read before,
+    page["tables"] becomes [{"rows", "index"}, ...] in that order.
+    """
+    lines = page["lines"]
+    kept = []
+    boxes = [table.pop("bbox") for table in tables]
+    indexes = [None] * len(tables)
+
+    for line in lines:
+        if isinstance(line, str):
+            kept.append(line)
+            continue
+
+        center = (line.x + (line.right or line.x)) / 2
+        inside = next((
+            number for number, (x0, top, x1, bottom) in enumerate(boxes)
+            if x0 <= center <= x1 and top - 1 <= line.y < bottom
+        ), None)
+
+        if inside is None:
+            kept.append(line)
+        elif indexes[inside] is None:
+            indexes[inside] = len(kept)
+
+    for number, (_, top, _, _) in enumerate(boxes):
+        if indexes[number] is None:
+            # No text of the table was extracted, place it by its top edge
+            indexes[number] = sum(1 for line in kept if not isinstance(line, str) and line.y < top)
+        tables[number]["index"] = indexes[number]
+
+    page["lines"] = kept
+    page["tables"] = sorted(tables, key=lambda table: table["index"])
+
 def pages_to_text(pages):
     all_lines = []
 
     for page in pages:
-        for line in page["lines"]:
-            if isinstance(line, str):
-                all_lines.append(line)
-            elif isinstance(line, dict):
-                all_lines.append(line.get("text", ""))
+        all_lines.extend(map(line_text, page["lines"]))
 
     return "\n".join(all_lines)
 
@@ -113,32 +538,587 @@ def word_count(text: str) -> int:
     return len(re.findall(r"\b\w+\b", text)) if text else 0
 
 
-def extract_best_text(pdf_path: str):
-    text_pymupdf_pages = extract_text_pymupdf(pdf_path)
-    text_pdfplumber_pages = extract_text_from_pdf(pdf_path)
+# PyMuPDF writes the raw glyph code of a font without a ToUnicode map,
+# which shows up as control characters (CID 1 -> "\x01")
+UNMAPPED_GLYPHS = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+
+def has_unresolved_glyphs(text: str) -> bool:
+    """
+    True when text still holds glyphs without a Unicode mapping:
+    (cid:NN) codes that CID_MAP does not cover, or raw glyph codes.
+    """
+    if UNMAPPED_GLYPHS.search(text):
+        return True
+    return any(cid not in CID_MAP for cid in CID_GLYPH.findall(text))
+
+
+def is_deficient_page(lines) -> bool:
+    """
+    A page needs a slower backend when the fast one found no words
+    or left unresolved glyphs behind. Checked on the raw text,
+    normalize_cid would already have dropped the (cid:NN) codes.
+    """
+    text = pages_to_text([{"lines": lines}])
+    return word_count(normalize_cid(text)) == 0 or has_unresolved_glyphs(text)
+
+
+def pdfplumber_has_rulings(page) -> bool:
+    """
+    pdfplumber counterpart of pymupdf_has_rulings, from the page's
+    line and rectangle edges.
+    """
+    horizontal = sum(1 for edge in page.horizontal_edges if edge["x1"] - edge["x0"] >= RULING_MIN_LENGTH)
+    vertical = sum(1 for edge in page.vertical_edges if edge["bottom"] - edge["top"] >= RULING_MIN_LENGTH)
+    return is_ruled(horizontal, vertical)
+
+
+def pdfplumber_page_lines(page) -> List[TextLine]:
+    """
+    Alignment-aware lines for a single pdfplumber page, in reading order.
+    """
+    page_width = page.width
+    lines = []
+
+    for line in page.extract_text_lines():
+        cleaned = line["text"].strip()
+        if not cleaned:
+            continue
+
+        chars = line.get("chars")
+        size = max(char["size"] for char in chars) if chars else 0.0
+
+        lines.append(TextLine(cleaned, "left", line["x0"], line["top"], size, line["x1"]))
 
-    text_pymupdf = pages_to_text(text_pymupdf_pages)
-    text_pdfplumber = pages_to_text(text_pdfplumber_pages)
+    return analyze_page_layout(lines, page_width)
 
-    if word_count(text_pymupdf) > word_count(text_pdfplumber):
-        final_text = text_pymupdf
-        source = "pymupdf"
+
+def pdfminer_line_text(text_line, font_tables: Dict) -> str:
+    """
+    Text of a pdfminer line, with (cid:NN) glyphs looked up in the
+    learned table of the glyph's font.
+    """
+    text = text_line.get_text()
+    if not font_tables or "(cid:" not in text:
+        return text
+
+    return "".join(
+        resolve_cid_glyph(char.get_text(), font_tables.get(char.fontname))
+        if isinstance(char, LTChar) else char.get_text()
+        for char in text_line
+    )
+
+
+def pdfminer_page_lines(source: PdfSource, page_numbers: List[int], font_tables: Dict = None) -> Dict[int, List[TextLine]]:
+    """
+    Re-extracts only the given pages (1-based) with pdfminer.
+    Used as the last resort for pages that still contain (cid:NN) glyphs.
+
+    font_tables: optional {font name: {cid: text}} (learn_font_tables),
+    used for glyphs pdfminer could not map itself.
+    """
+    results = {}
+    if not page_numbers:
+        return results
+
+    wanted = sorted(page_numbers)
+
+    try:
+        layouts = pdfminer_extract_pages(as_pdf_stream(source), page_numbers=[n - 1 for n in wanted])
+
+        for page_number, layout in zip(wanted, layouts):
+            lines = []
+
+            for element in layout:
+                if not isinstance(element, LTTextContainer):
+                    continue
+
+                for text_line in element:
+                    if not isinstance(text_line, LTTextLine):
+                        continue
+
+                    cleaned = pdfminer_line_text(text_line, font_tables).strip()
+                    if cleaned:
+                        lines.append(TextLine(
+                            cleaned, "left", text_line.x0,
+                            layout.height - text_line.y1, text_line.height, text_line.x1
+                        ))
+
+            results[page_number] = analyze_page_layout(lines, layout.width)
+    except Exception:
+        return results
+
+    return results
+
+
+def iter_pdfplumber_line_pages(source: PdfSource, start: int, stop: int, include_tables: bool = False):
+    """
+    Yields alignment-aware lines for pages [start, stop) (0-based) with pdfplumber.
+    Used when pdfplumber is chosen as the primary backend. Pages are
+    flagged ("ruled", "image_only") like iter_pymupdf_pages does.
+    Unchanged pages come from the page cache.
+    """
+    with pdfplumber.open(as_pdf_stream(source), pages=list(range(start + 1, stop + 1))) as pdf, \
+            page_fingerprints(source) as fingerprint:
+        for page in pdf.pages:
+            page_fingerprint = fingerprint(page.page_number - 1)
+            key = ("pdfplumber", include_tables, page_fingerprint)
+            cached = cached_page(key, page.page_number)
+            if cached is not None:
+                yield cached
+                continue
+
+            with stage("pdfplumber"):
+                lines = pdfplumber_page_lines(page)
+                record = {
+                    "page_number": page.page_number,
+                    "lines": lines,
+                    "width": page.width,
+                    "source": "pdfplumber",
+                    "image_only": is_image_only(lines, lambda: image_coverage(
+                        ((image["x0"], image["top"], image["x1"], image["bottom"]) for image in page.images),
+                        page.width, page.height
+                    )),
+                    "fingerprint": page_fingerprint
+                }
+
+                if include_tables:
+                    record["ruled"] = pdfplumber_has_rulings(page)
+
+                page.close()
+
+            cache_page(key, record)
+
+            yield record
+
+
+def page_word_count(page) -> int:
+    return word_count(normalize_cid(pages_to_text([page])))
+
+
+def better_page(pymupdf_page, pdfplumber_page):
+    # Same tie-break as before: pdfplumber wins unless PyMuPDF has more words
+    if page_word_count(pymupdf_page) > page_word_count(pdfplumber_page):
+        return pymupdf_page
+    return pdfplumber_page
+
+
+def with_pdfplumber_fallback(pages, source: PdfSource):
+    """
+    Re-extracts PyMuPDF pages that came out deficient with pdfplumber.
+    The pdfplumber document is opened lazily and at most once.
+    """
+    with ExitStack() as stack:
+        plumber_pdf = None
+
+        for page in pages:
+            # pdfplumber finds no more text on a scan than PyMuPDF did
+            if not page.get("image_only") and is_deficient_page(page["lines"]):
+                count("pdfplumber_fallback_pages")
+
+                with stage("pdfplumber"):
+                    if plumber_pdf is None:
+                        plumber_pdf = stack.enter_context(pdfplumber.open(as_pdf_stream(source)))
+
+                    plumber_page = plumber_pdf.pages[page["page_number"] - 1]
+                    lines = pdfplumber_page_lines(plumber_page)
+                    plumber_page.close()
+
+                page = better_page(page, dict(page, lines=lines, source="pdfplumber"))
+
+            yield page
+
+
+def iter_adaptive_pages(source: PdfSource, page_count: int, include_tables: bool = False):
+    """
+    Pre-scans the first PRESCAN_PAGES pages with PyMuPDF and only hands
+    the deficient ones (no words, unresolved glyphs) to pdfplumber, then
+    extracts the rest of the document with the backend that did better.
+    Born-digital PDFs never open pdfplumber. Image-only pages of the
+    pre-scan are not read with pdfplumber.
+    """
+    prescan = min(PRESCAN_PAGES, page_count)
+
+    head_pymupdf = list(iter_pymupdf_pages(source, 0, prescan, include_tables))
+    head = list(with_pdfplumber_fallback(head_pymupdf, source))
+
+    # pdfplumber only ran on the pages PyMuPDF got wrong, it becomes the
+    # primary backend when those pages hold enough of the text
+    pymupdf_words = sum(page_word_count(page) for page in head_pymupdf if not page["image_only"])
+    best_words = sum(page_word_count(page) for page in head if not page["image_only"])
+
+    use_pymupdf = pymupdf_words >= best_words * PYMUPDF_MIN_WORD_RATIO
+    count("primary_pymupdf" if use_pymupdf else "primary_pdfplumber")
+
+    yield from head
+
+    if use_pymupdf:
+        # Large documents are sharded across processes, see iter_page_ranges
+        tail = iter_page_ranges(source, iter_pymupdf_pages, page_count, include_tables, start=prescan)
+        yield from with_pdfplumber_fallback(tail, source)
+    else:
+        yield from iter_page_ranges(source, iter_pdfplumber_line_pages, page_count, include_tables, start=prescan)
+
+
+COMPARED_BACKENDS = {
+    "pymupdf": iter_pymupdf_pages,
+    "pdfplumber": iter_pdfplumber_line_pages
+}
+
+
+def run_shard_inline(source: PdfSource, iter_fn, start: int, stop: int, args) -> Future:
+    # Same result shape as _run_shard, stage timings go straight to the caller
+    future = Future()
+    future.set_result((list(iter_fn(source, start, stop, *args)), {}, {}))
+    return future
+
+
+def compare_shards(page_count: int):
+    # Small first steps so a clear winner shows up early, then larger ones:
+    # every step reopens the document in the backend
+    shards = []
+    size = max(1, COMPARE_SHARD_SIZE)
+    first = 0
+    while first < page_count:
+        shards.append((first, min(first + size, page_count)))
+        first += size
+        if len(shards) > 1:
+            size = max(size, min(size * 2, PARALLEL_SHARD_SIZE))
+    return shards
+
+
+def leading_backend(shards, shard_words):
+    """
+    The backend that is clearly ahead on the pages both backends have
+    read so far, or None while it is too early to tell.
+    """
+    read = 0
+    while read < len(shards) and all(read in words for words in shard_words.values()):
+        read += 1
+
+    if not COMPARE_DECIDE_PAGES or not read or shards[read - 1][1] < COMPARE_DECIDE_PAGES:
+        return None
+
+    totals = {name: sum(words[index] for index in range(read)) for name, words in shard_words.items()}
+    for name, other in (("pymupdf", "pdfplumber"), ("pdfplumber", "pymupdf")):
+        if totals[name] > totals[other] * (1 + COMPARE_DECIDE_MARGIN):
+            return name
+    return None
+
+
+def iter_compared_pages(source: PdfSource, page_count: int, include_tables: bool = False):
+    """
+    Original behaviour: both backends read the whole document and the
+    one with more words wins (pdfplumber on a tie). Kept for comparisons
+    against adaptive mode.
+
+    The backends take turns on shards of the document (compare_shards), in
+    worker processes for documents of at least PARALLEL_PAGE_THRESHOLD
+    pages when page-parallel extraction is available with at least two
+    PARALLEL_WORKERS, so both run at the same time. With the default
+    settings (one worker per conversion when the pool uses every CPU)
+    they run serially. As soon as one is clearly ahead on the pages
+    read by both (see leading_backend), the other one's shards are
+    cancelled and the winner's pages are yielded while it finishes.
+    """
+    shards = compare_shards(page_count)
+    args = (include_tables,)
+
+    with ExitStack() as stack:
+        pool = None
+        workers = min(PARALLEL_WORKERS, 2 * len(shards))
+
+        # Small documents are compared serially, as in iter_page_ranges:
+        # starting a pool costs more than it saves
+        if PARALLEL_EXTRACTION and workers >= 2 and page_count >= PARALLEL_PAGE_THRESHOLD:
+            try:
+                pool = shard_pool(workers, source)
+                # The loser's running shard is not waited for
+                stack.callback(pool.shutdown, wait=False, cancel_futures=True)
+            except (OSError, NotImplementedError) as e:
+                print(f"Warning: parallel extraction unavailable ({e}), comparing serially")
+                pool = None
+
+        if pool is None:
+            workers = 1
+
+        results = {name: {} for name in COMPARED_BACKENDS}
+        shard_words = {name: {} for name in COMPARED_BACKENDS}
+        submitted = dict.fromkeys(COMPARED_BACKENDS, 0)
+        running = {}
+        winner = None
+        yielded = 0
+
+        def submit_next():
+            # The backend that is behind goes first, so both cover the same pages
+            contenders = [winner] if winner else list(COMPARED_BACKENDS)
+            name = min(contenders, key=lambda name: submitted[name])
+            if submitted[name] >= len(shards):
+                return False
+
+            index = submitted[name]
+            submitted[name] += 1
+            start, stop = shards[index]
+            iter_fn = COMPARED_BACKENDS[name]
+
+            if pool is None:
+                running[run_shard_inline(source, iter_fn, start, stop, args)] = (name, index)
+            else:
+                running[pool.submit(_run_shard, iter_fn, start, stop, args)] = (name, index)
+            return True
+
+        # Every worker busy plus one shard queued, as in iter_page_ranges
+        while len(running) <= workers and submit_next():
+            pass
+
+        while running:
+            with stage("parallel_wait"):
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                name, index = running.pop(future)
+                shard_pages, timings, counters = future.result()
+                merge_stages(timings, counters)
+
+                results[name][index] = shard_pages
+                shard_words[name][index] = sum(page_word_count(page) for page in shard_pages)
+
+            if winner is None:
+                winner = leading_backend(shards, shard_words)
+
+                if winner is not None:
+                    count("compare_decided_early")
+                    for future, (name, _) in list(running.items()):
+                        if name != winner:
+                            future.cancel()
+                            del running[future]
+
+            while len(running) <= workers and submit_next():
+                pass
+
+            # Once decided, the winner's pages stream out in order
+            while winner is not None and yielded in results[winner]:
+                yield from results[winner].pop(yielded)
+                yielded += 1
+
+        if winner is None:
+            pymupdf_words = sum(shard_words["pymupdf"].values())
+            pdfplumber_words = sum(shard_words["pdfplumber"].values())
+            winner = "pymupdf" if pymupdf_words > pdfplumber_words else "pdfplumber"
+
+        for index in range(yielded, len(shards)):
+            yield from results[winner][index]
+
+
+def iter_document_pages(source: PdfSource, include_tables: bool = None, mode: str = None):
+    """
+    Streaming extraction engine, yields one finished page at a time.
+
+    source can be a file path, bytes/memoryview or a binary file object,
+    so uploads never need to be written to disk first.
+
+    mode is "adaptive" or "compare" (default: EXTRACTION_MODE), see
+    iter_adaptive_pages / iter_compared_pages. Pages that still contain
+    unmapped glyphs afterwards go through pdfminer, with CID tables
+    learned from the fonts' ToUnicode maps (see pdf_cid).
+
+    include_tables (default: TABLE_EXTRACTION) extracts the tables of
+    pages with ruling lines, see with_tables. Each yielded page looks
+    like: {"page_number", "lines", "width", "source", "tables",
+    "image_only", "fingerprint"} (fingerprint: see pdf_page_cache, None
+    when the page cache is disabled)
+    """
+    source = _picklable_source(source)
+    page_count = pdf_page_count(source)
+    include_tables = TABLE_EXTRACTION if include_tables is None else include_tables
+
+    if (mode or EXTRACTION_MODE) == "compare":
+        pages = iter_compared_pages(source, page_count, include_tables)
     else:
-        final_text = text_pdfplumber
-        source = "pdfplumber"
+        pages = iter_adaptive_pages(source, page_count, include_tables)
+
+    pages = with_cid_fallback(pages, source)
+    if include_tables:
+        pages = with_tables(pages, source)
+
+    for page in pages:
+        page.setdefault("tables", [])
+        if page.get("image_only"):
+            count("image_only_pages")
+        yield page
+
+
+def with_cid_fallback(pages, source: PdfSource):
+    """
+    Re-extracts pages with unmapped glyphs with pdfminer, looking the
+    glyphs up in the CID tables learned once per document.
+    """
+    font_tables = None
+
+    for page in pages:
+        if not has_unresolved_glyphs(pages_to_text([page])):
+            yield page
+            continue
+
+        # CID tables of the document's fonts, learned once per document
+        if font_tables is None:
+            with stage("cid_fonts"):
+                font_tables = document_font_tables(source)
+            count("cid_font_tables", len(font_tables))
+
+        # pdfminer maps glyphs no better than pdfplumber on its own,
+        # it is only worth running with learned tables to look glyphs up in
+        if not font_tables:
+            count("cid_unresolved_pages")
+            yield page
+            continue
+
+        count("pdfminer_fallback_pages")
+        with stage("pdfminer"):
+            lines = pdfminer_page_lines(source, [page["page_number"]], font_tables).get(page["page_number"])
+
+        if lines and (not has_unresolved_glyphs(pages_to_text([{"lines": lines}])) or page_word_count(page) == 0):
+            page["lines"] = lines
+            page["source"] = "pdfminer"
+        else:
+            count("cid_unresolved_pages")
+
+        yield page
+
+
+def with_tables(pages, source: PdfSource):
+    """
+    Runs pdfplumber's table finder on the pages flagged as ruled by the
+    backend pass, and places the tables in their lines (place_tables).
+    Pages without ruling lines never reach pdfplumber, the document is
+    opened lazily and at most once. Tables of unchanged pages come from
+    the page cache.
+    """
+    with ExitStack() as stack:
+        plumber_pdf = None
+
+        for page in pages:
+            if page.pop("ruled", False):
+                count("table_pages")
+
+                key = ("tables", page.get("fingerprint"))
+                found = PAGE_CACHE.get(key)
 
-    final_text = normalize_cid(final_text)
+                with stage("tables"):
+                    if found is None:
+                        if plumber_pdf is None:
+                            plumber_pdf = stack.enter_context(pdfplumber.open(as_pdf_stream(source)))
 
-    if "(cid:" in final_text:
-        final_text = extract_text_pdfminer(pdf_path)
-        source += " + pdfminer"
+                        plumber_page = plumber_pdf.pages[page["page_number"] - 1]
+                        found = [(table["rows"], table["bbox"]) for table in pdfplumber_page_tables(plumber_page)]
+                        plumber_page.close()
 
-    return final_text, source
+                        if key[-1] is not None:
+                            PAGE_CACHE.put(key, found)
 
+                    # place_tables takes the boxes out, it gets its own dicts
+                    tables = [{"rows": rows, "bbox": bbox} for rows, bbox in found]
+                    place_tables(page, tables)
 
-def extract_text_pdfminer(pdf_path: str) -> str:
+                count("tables", len(tables))
+
+            yield page
+
+
+def document_font_tables(source: PdfSource) -> Dict:
+    """
+    {font name: {cid: text}} for the fonts of a document, see pdf_cid.
+    """
+    try:
+        with open_pymupdf(source) as doc:
+            return learn_font_tables(doc)
+    except Exception:
+        return {}
+
+
+def source_label(page_sources, mode: str = None) -> str:
+    """
+    Describes which backends produced a document and how they were chosen,
+    e.g. "pymupdf + pdfminer (adaptive)". Backends are listed by page share.
+    """
+    counts = {}
+    for name in page_sources:
+        counts[name] = counts.get(name, 0) + 1
+
+    backends = sorted(counts, key=lambda name: -counts[name]) or ["pymupdf"]
+    return f"{' + '.join(backends)} ({mode or EXTRACTION_MODE})"
+
+
+def iter_text_lines(pages):
+    """
+    Yields the cleaned text of every line across pages, one at a time.
+    Tables are yielded in between, at their position, as their list of
+    rows (see place_tables).
+    """
+    for page in pages:
+        tables = page.get("tables")
+        if not tables:
+            for line in page["lines"]:
+                yield normalize_cid(line_text(line))
+            continue
+
+        tables = iter(tables)
+        table = next(tables, None)
+
+        for index, line in enumerate(page["lines"]):
+            while table is not None and table["index"] <= index:
+                yield table["rows"]
+                table = next(tables, None)
+            yield normalize_cid(line_text(line))
+
+        while table is not None:
+            yield table["rows"]
+            table = next(tables, None)
+
+
+def extract_document(source: PdfSource, include_tables: bool = False, mode: str = None) -> Dict:
+    """
+    Collects iter_document_pages into a whole document.
+
+    Returns:
+    {
+        "pages": [{"page_number", "lines", "source", "tables"}, ...],
+        "tables": [{"page_number", "table"}, ...],
+        "text": "normalized document text",
+        "source": "pymupdf (adaptive)" | "pdfplumber + pdfminer (compare)" | ...
+    }
+
+    With include_tables the text of table cells is only found in the
+    tables, iter_text_lines(document["pages"]) yields both in order.
+    """
+    pages = []
+    tables = []
+
+    for page in iter_document_pages(source, include_tables, mode):
+        for table in page["tables"]:
+            tables.append({
+                "page_number": page["page_number"],
+                "table": table["rows"]
+            })
+        pages.append(page)
+
+    return {
+        "pages": pages,
+        "tables": tables,
+        "text": normalize_cid(pages_to_text(pages)),
+        "source": source_label((page["source"] for page in pages), mode)
+    }
+
+
+def extract_best_text(source: PdfSource):
+    document = extract_document(source)
+    return document["text"], document["source"]
+
+
+def extract_text_pdfminer(source: PdfSource) -> str:
     try:
-        return pdfminer_extract_text(pdf_path) or ""
+        with stage("pdfminer"):
+            return pdfminer_extract_text(as_pdf_stream(source)) or ""
     except Exception:
         return ""
 
@@ -154,22 +1134,15 @@ CID_MAP = {
 def normalize_cid(text: str) -> str:
     def replace(match):
         return CID_MAP.get(match.group(1), "")
-    return re.sub(r"\(cid:(\d+)\)", replace, text)
+    return CID_GLYPH.sub(replace, text)
 
-def extract_lines_with_alignment(pdf_path: str):
+def extract_lines_with_alignment(source: PdfSource, document: Dict = None):
     """
     Returns alignment-aware lines for Word rendering.
-    Uses PyMuPDF output (because it has coordinates).
+    Reuses the pages of an already extracted document when one is given,
+    otherwise extracts with PyMuPDF (because it has coordinates).
     """
-    pages = extract_text_pymupdf(pdf_path)
-
-    aligned_lines = []
-
-    for page in pages:
-        for line in page["lines"]:
-            aligned_lines.append({
-                "text": line["text"],
-                "alignment": line["alignment"]
-            })
+    pages = document["pages"] if document else extract_text_pymupdf(source)
 
-    return aligned_lines
+    # Lines are passed through as they are, plain strings become left-aligned lines
+    return [as_text_line(line) for page in pages for line in page["lines"]]
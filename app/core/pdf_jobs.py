@@ -0,0 +1,353 @@
+import itertools
+import json
+import os
+import queue
+import re
+import shutil
+import threading
+import time
+import uuid
+
+from app.core.pdf_metrics import REGISTRY
+from app.core.pdf_pipeline import run_pipeline
+from app.core.pdf_worker import CLIENT_MAX_CONVERSIONS, ClientBusyError, PoolBusyError, schedule_key
+
+
+# Job settings (override through environment variables)
+JOB_RESULT_TTL = float(os.getenv("PDF_JOB_RESULT_TTL", "3600"))   # seconds a finished job is kept
+JOB_WORKERS = int(os.getenv("PDF_JOB_WORKERS", "1"))
+JOB_QUEUE_LIMIT = int(os.getenv("PDF_JOB_QUEUE_LIMIT", "100"))    # queued jobs accepted (0 = no limit)
+# Background jobs exist for conversions too long for an upload request,
+# they get their own, longer timeout (seconds, 0 = no limit)
+BACKGROUND_JOB_TIMEOUT = float(os.getenv("PDF_BACKGROUND_JOB_TIMEOUT", "3600"))
+
+# Job ids are uuid4 hex strings, anything else is rejected before touching disk
+JOB_ID_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+
+# Progress is written to disk at most this often (seconds)
+PROGRESS_WRITE_INTERVAL = 0.5
+# Wait before a job retries when the conversion pool is full (seconds)
+POOL_RETRY_INTERVAL = 1.0
+
+
+def write_progress(path: str, progress: dict):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(progress, f)
+    os.replace(tmp_path, path)
+
+
+def run_job_pipeline(pdf_bytes: bytes, progress_path: str) -> dict:
+    """
+    run_pipeline for a job: pages and sections done are written to
+    progress_path as they happen, so progress is visible from another
+    process. A plain top-level function, like run_pipeline, so it can
+    run in the conversion pool.
+    """
+    progress = {"pages_done": 0, "sections_done": 0}
+    last_write = [0.0]
+
+    def update(field, value):
+        progress[field] = value
+        if time.time() - last_write[0] >= PROGRESS_WRITE_INTERVAL:
+            last_write[0] = time.time()
+            try:
+                write_progress(progress_path, progress)
+            except OSError:
+                pass
+
+    def section_done(heading, lines):
+        update("sections_done", progress["sections_done"] + 1)
+
+    return run_pipeline(pdf_bytes, progress=lambda page_number: update("pages_done", page_number),
+                        on_section=section_done)
+
+
+def convert_locally(pdf_bytes: bytes, progress_path: str):
+    """
+    Default job conversion: runs the pipeline in the job's own thread.
+    Returns (docx_bytes, image_pages).
+    """
+    result = run_job_pipeline(pdf_bytes, progress_path)
+    REGISTRY.record_conversion(
+        result["timings"], result["counters"], result["pages"],
+        len(pdf_bytes), len(result["docx"]), result["seconds"]
+    )
+    return result["docx"], result["image_pages"]
+
+
+class JobStore:
+    """
+    File-backed queue of conversion jobs, drained by local worker threads.
+
+    Every job lives in its own directory under root:
+    - input.pdf    uploaded file, removed once the job finishes
+    - status.json  status, error message
+    - progress.json  pages and sections done while the job runs
+    - result.docx  converted document
+
+    Jobs that were queued or running when the process stopped are
+    picked up again on start(). Finished jobs are deleted after `ttl` seconds.
+    Queued jobs run cheapest first by their preflight cost estimate,
+    with the same aging as the conversion pool (schedule_key). At most
+    `queue_limit` jobs wait at once (PoolBusyError), and one client may
+    have CLIENT_MAX_CONVERSIONS jobs queued or running (ClientBusyError).
+
+    The conversion itself is done by the `convert` callable given to
+    start(), see convert_locally.
+    """
+
+    def __init__(self, root: str, ttl=JOB_RESULT_TTL, workers=JOB_WORKERS,
+                 queue_limit=JOB_QUEUE_LIMIT, client_limit=CLIENT_MAX_CONVERSIONS):
+        self.root = root
+        self.ttl = ttl
+        self.workers = max(1, workers)
+        self.queue_limit = max(0, queue_limit)
+        self.client_limit = max(0, client_limit)
+        self.convert = convert_locally
+
+        self._queue = queue.PriorityQueue()
+        self._sequence = itertools.count()
+        self._threads = []
+        self._stopping = threading.Event()
+        self._lock = threading.Lock()
+        self._statuses = {}
+        self._clients = {}
+        self.running = 0
+
+        os.makedirs(root, exist_ok=True)
+
+    # -------------------------------------------------
+    # PUBLIC API
+    # -------------------------------------------------
+    def submit(self, pdf_bytes: bytes, filename: str = None, estimate: dict = None, client=None) -> dict:
+        """
+        Queues a conversion. estimate: output of pdf_preflight.preflight,
+        gives the job its page count and place in the queue. client: the
+        id the job counts against for the per-client limit.
+        """
+        if self.queue_limit and self._queue.qsize() >= self.queue_limit:
+            raise PoolBusyError("Job queue is full")
+
+        with self._lock:
+            active = sum(1 for owner in self._clients.values() if owner == client)
+            if client is not None and self.client_limit and active >= self.client_limit:
+                raise ClientBusyError(f"Too many jobs in progress for this client (limit {self.client_limit})")
+
+            job_id = uuid.uuid4().hex
+            self._clients[job_id] = client
+
+        estimate = estimate or {}
+        job_dir = self._job_dir(job_id)
+        os.makedirs(job_dir)
+
+        with open(os.path.join(job_dir, "input.pdf"), "wb") as f:
+            f.write(pdf_bytes)
+
+        status = self._save_status(job_id, {
+            "job_id": job_id,
+            "status": "queued",
+            "filename": filename,
+            "pages_done": 0,
+            "sections_done": 0,
+            "page_count": estimate.get("pages"),
+            "image_pages": None,
+            "cost": estimate.get("cost", 0.0),
+            "error": None,
+            "created_at": time.time(),
+            "finished_at": None
+        })
+
+        self._enqueue(status)
+        return status
+
+    def status(self, job_id: str):
+        """
+        Returns the job status dict, or None for unknown/expired jobs.
+        """
+        if not JOB_ID_PATTERN.match(job_id):
+            return None
+
+        with self._lock:
+            status = self._statuses.get(job_id)
+            status = dict(status) if status is not None else None
+
+        if status is None:
+            status = self._load_status(job_id)
+
+        if status and status["status"] == "running":
+            try:
+                with open(self._progress_path(job_id), "r", encoding="utf-8") as f:
+                    status.update(json.load(f))
+            except (OSError, ValueError):
+                pass
+
+        return status
+
+    def queued(self) -> int:
+        return self._queue.qsize()
+
+    def result_path(self, job_id: str) -> str:
+        return os.path.join(self._job_dir(job_id), "result.docx")
+
+    def start(self, convert=None):
+        """
+        Starts the worker threads. convert(pdf_bytes, progress_path)
+        returns (docx_bytes, image_pages) and is called from them
+        (default: convert_locally).
+        """
+        self.convert = convert or convert_locally
+        self._stopping.clear()
+
+        # Resume jobs left behind by a previous process
+        for job_id in sorted(os.listdir(self.root), key=self._created_at):
+            status = self._load_status(job_id)
+            if status and status["status"] in ("queued", "running"):
+                self._enqueue(self._save_status(job_id, dict(status, status="queued", pages_done=0, sections_done=0)))
+
+        for _ in range(self.workers):
+            thread = threading.Thread(target=self._worker_loop, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        self._stopping.set()
+        for _ in self._threads:
+            self._queue.put((float("-inf"), next(self._sequence), None))
+        self._threads = []
+
+    def cleanup_expired(self):
+        now = time.time()
+
+        for job_id in os.listdir(self.root):
+            status = self._load_status(job_id)
+            if not status or not status["finished_at"]:
+                continue
+
+            if now - status["finished_at"] > self.ttl:
+                shutil.rmtree(self._job_dir(job_id), ignore_errors=True)
+                with self._lock:
+                    self._statuses.pop(job_id, None)
+
+    # -------------------------------------------------
+    # WORKER
+    # -------------------------------------------------
+    def _worker_loop(self):
+        while not self._stopping.is_set():
+            try:
+                _, _, job_id = self._queue.get(timeout=60)
+            except queue.Empty:
+                self.cleanup_expired()
+                continue
+
+            if job_id is None:
+                break
+
+            with self._lock:
+                self.running += 1
+            try:
+                self._run(job_id)
+            finally:
+                with self._lock:
+                    self.running -= 1
+            self.cleanup_expired()
+
+    def _run(self, job_id: str):
+        job_dir = self._job_dir(job_id)
+        input_path = os.path.join(job_dir, "input.pdf")
+        status = self._load_status(job_id)
+
+        if status is None:
+            # Removed while it was queued (expired or deleted by hand)
+            print(f"Job {job_id} has no status, skipped")
+            with self._lock:
+                self._statuses.pop(job_id, None)
+                self._clients.pop(job_id, None)
+            return
+
+        finished = False
+        try:
+            # PDF libraries are only imported once a job actually runs
+            from app.core.pdf_extract import pdf_page_count
+
+            with open(input_path, "rb") as f:
+                pdf_bytes = f.read()
+
+            status = self._save_status(job_id, dict(
+                status, status="running", page_count=status.get("page_count") or pdf_page_count(pdf_bytes)
+            ))
+
+            while True:
+                try:
+                    docx_bytes, image_pages = self.convert(pdf_bytes, self._progress_path(job_id))
+                    break
+                except PoolBusyError:
+                    # Uploads have filled the pool, the job waits for its turn
+                    if self._stopping.wait(POOL_RETRY_INTERVAL):
+                        # Stays "running" with its input, start() resumes it
+                        return
+
+            tmp_path = self.result_path(job_id) + ".tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(docx_bytes)
+            os.replace(tmp_path, self.result_path(job_id))
+
+            self._save_status(job_id, dict(
+                self.status(job_id) or status, status="done", pages_done=status["page_count"],
+                image_pages=image_pages, finished_at=time.time()
+            ))
+            finished = True
+        except Exception as e:
+            print(f"Job {job_id} failed: {e}")
+            try:
+                self._save_status(job_id, dict(
+                    self.status(job_id) or status, status="failed",
+                    error=str(e), finished_at=time.time()
+                ))
+            except OSError as save_error:
+                print(f"Job {job_id}: could not save its status: {save_error}")
+            finished = True
+        finally:
+            with self._lock:
+                self._clients.pop(job_id, None)
+            for path in (input_path, self._progress_path(job_id)) if finished else ():
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def _enqueue(self, status: dict):
+        # created_at is wall-clock time, so resumed jobs keep their place
+        key = schedule_key(status.get("cost") or 0.0, status["created_at"])
+        self._queue.put((key, next(self._sequence), status["job_id"]))
+
+    # -------------------------------------------------
+    # STATUS FILES
+    # -------------------------------------------------
+    def _job_dir(self, job_id):
+        return os.path.join(self.root, job_id)
+
+    def _progress_path(self, job_id):
+        return os.path.join(self._job_dir(job_id), "progress.json")
+
+    def _created_at(self, job_id):
+        status = self._load_status(job_id)
+        return status["created_at"] if status else 0
+
+    def _load_status(self, job_id):
+        try:
+            with open(os.path.join(self._job_dir(job_id), "status.json"), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _save_status(self, job_id, status: dict) -> dict:
+        with self._lock:
+            self._statuses[job_id] = dict(status)
+
+        path = os.path.join(self._job_dir(job_id), "status.json")
+        tmp_path = path + ".tmp"
+
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(status, f)
+        os.replace(tmp_path, path)
+
+        return dict(status)
@@ -0,0 +1,201 @@
+import os
+
+from app.core.pdf_lines import TextLine
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional, lines keep the per-line heuristic without it
+    np = None
+
+
+# Layout analysis settings (override through environment variables)
+LAYOUT_ANALYSIS = os.getenv("PDF_LAYOUT_ANALYSIS", "1") == "1"
+
+# Column detection: a gutter is an empty vertical strip at least this wide
+# (fraction of the page width), searched for in the middle of the page
+GUTTER_MIN_WIDTH = 0.02
+GUTTER_SEARCH = (0.2, 0.8)
+
+# Columns only count as text columns when every one of them has this many
+# lines and its lines fill most of its width (forms with label/value pairs don't)
+COLUMN_MIN_LINES = 8
+COLUMN_MIN_FILL = 0.6
+
+# Edge alignment: tolerance around the column edges, and how far apart the
+# left and right gaps of a centered line may be (fractions of the column width)
+EDGE_TOLERANCE = 0.02
+CENTER_TOLERANCE = 0.05
+
+# Right-aligned lines (dates, signatures) are short, long indented lines
+# that happen to reach the right edge are wrapped left-aligned text
+RIGHT_MAX_WIDTH = 0.5
+
+# Below this many lines a column gives no useful text box, the page-relative heuristic is used
+BOX_MIN_LINES = 3
+
+ALIGNMENTS = ("left", "center", "right")
+
+
+def infer_alignment(x: float, page_width: float) -> str:
+    center_left = page_width * 0.4
+    center_right = page_width * 0.6
+    right_threshold = page_width * 0.75
+
+    if center_left <= x <= center_right:
+        return "center"
+    if x >= right_threshold:
+        return "right"
+    return "left"
+
+
+def analyze_page_layout(lines: list[TextLine], page_width: float) -> list[TextLine]:
+    """
+    Sets the alignment of every line on a page and returns the lines in
+    reading order.
+
+    With NumPy the whole page is handled as arrays of line boxes:
+    - columns are found from gaps in the horizontal coverage of the lines
+    - alignment comes from both the left and the right edge, measured
+      against the text box of the line's column
+    - multi-column pages are sorted into reading order: lines spanning
+      all columns split the page into bands, each band is read column
+      by column, top to bottom
+
+    Single-column pages keep the extractor's order. Without NumPy (or
+    with PDF_LAYOUT_ANALYSIS=0) every line falls back to infer_alignment.
+    """
+    if not lines:
+        return lines
+
+    if np is None or not LAYOUT_ANALYSIS:
+        for line in lines:
+            line.alignment = infer_alignment(line.x, page_width)
+        return lines
+
+    count = len(lines)
+    x0 = np.fromiter((line.x for line in lines), dtype=float, count=count)
+    x1 = np.fromiter((line.right or line.x for line in lines), dtype=float, count=count)
+    y = np.fromiter((line.y for line in lines), dtype=float, count=count)
+
+    columns, column_count = find_columns(x0, x1, page_width)
+    codes = alignment_codes(x0, x1, columns, column_count, page_width)
+
+    for line, code in zip(lines, codes.tolist()):
+        line.alignment = ALIGNMENTS[code]
+
+    if column_count < 2:
+        return lines
+
+    return [lines[index] for index in reading_order(x0, y, columns).tolist()]
+
+
+def find_columns(x0, x1, page_width: float):
+    """
+    Returns (column index per line, number of columns). Lines that cross
+    a gutter get column -1. Anything that does not look like real text
+    columns is reported as a single column.
+    """
+    count = len(x0)
+    single = np.zeros(count, dtype=int), 1
+
+    if count < 2 * COLUMN_MIN_LINES or page_width <= 0:
+        return single
+
+    # Horizontal coverage in 1pt bins: how many lines cover each x position
+    bins = int(page_width) + 1
+    starts = np.clip(x0, 0, page_width).astype(int)
+    ends = np.clip(x1, 0, page_width).astype(int)
+    coverage = np.cumsum(np.bincount(starts, minlength=bins + 1) - np.bincount(ends, minlength=bins + 1))[:bins]
+
+    # A few lines (titles, rules) may cross the gutter
+    empty = coverage <= max(1, count // 20)
+    lo, hi = int(page_width * GUTTER_SEARCH[0]), int(page_width * GUTTER_SEARCH[1])
+    empty[:lo] = False
+    empty[hi:] = False
+
+    # Runs of empty bins wide enough to be a gutter
+    edges = np.diff(np.concatenate(([0], empty.astype(np.int8), [0])))
+    run_starts = np.flatnonzero(edges == 1)
+    run_ends = np.flatnonzero(edges == -1)
+    wide = (run_ends - run_starts) >= page_width * GUTTER_MIN_WIDTH
+    gutter_left, gutter_right = run_starts[wide], run_ends[wide]
+
+    if not len(gutter_left):
+        return single
+
+    centers = (x0 + x1) / 2
+    columns = np.searchsorted((gutter_left + gutter_right) / 2, centers)
+    spanning = ((x0[:, None] < gutter_left) & (x1[:, None] > gutter_right)).any(axis=1)
+    columns[spanning] = -1
+
+    column_count = len(gutter_left) + 1
+    in_column = columns[~spanning]
+    widths = (x1 - x0)[~spanning]
+
+    if (np.bincount(in_column, minlength=column_count) < COLUMN_MIN_LINES).any():
+        return single
+
+    for column in range(column_count):
+        members = in_column == column
+        box = x1[~spanning][members].max() - x0[~spanning][members].min()
+        if box <= 0 or np.median(widths[members]) < COLUMN_MIN_FILL * box:
+            return single
+
+    return columns, column_count
+
+
+def alignment_codes(x0, x1, columns, column_count: int, page_width: float):
+    """
+    Alignment index into ALIGNMENTS for every line.
+    """
+    count = len(x0)
+
+    # Text box of each line's column (spanning lines use the whole page's text box)
+    box_left = np.full(count, x0.min())
+    box_right = np.full(count, x1.max())
+    box_lines = np.full(count, count)
+
+    for column in range(column_count):
+        members = columns == column
+        if column_count > 1 and members.any():
+            box_left[members] = x0[members].min()
+            box_right[members] = x1[members].max()
+            box_lines[members] = members.sum()
+
+    box_width = np.maximum(box_right - box_left, 1.0)
+    tolerance = np.maximum(2.0, EDGE_TOLERANCE * box_width)
+
+    left_gap = x0 - box_left
+    right_gap = box_right - x1
+
+    flush_left = left_gap <= tolerance
+    flush_right = right_gap <= tolerance
+    centered = ~flush_left & ~flush_right & (np.abs(left_gap - right_gap) <= np.maximum(tolerance, CENTER_TOLERANCE * box_width))
+    short = (x1 - x0) <= RIGHT_MAX_WIDTH * box_width
+    right = ~flush_left & ~centered & short & (flush_right | (left_gap > box_width / 2))
+
+    codes = np.where(right, 2, np.where(centered, 1, 0))
+
+    # Too few lines for a meaningful text box: same thresholds as infer_alignment
+    sparse = box_lines < BOX_MIN_LINES
+    if sparse.any():
+        page_codes = np.where(
+            (x0 >= page_width * 0.4) & (x0 <= page_width * 0.6), 1,
+            np.where(x0 >= page_width * 0.75, 2, 0)
+        )
+        codes = np.where(sparse, page_codes, codes)
+
+    return codes
+
+
+def reading_order(x0, y, columns):
+    """
+    Indexes of the lines in reading order for a multi-column page.
+    """
+    spanning_y = np.sort(y[columns == -1])
+
+    # Every spanning line starts a new band, bands are read top to bottom
+    bands = np.searchsorted(spanning_y, y, side="right")
+
+    # Within a band: the spanning line first, then each column top to bottom
+    return np.lexsort((x0, y, columns, bands))
@@ -0,0 +1,50 @@
+class TextLine:
+    """
+    One extracted line of text.
+
+    A __slots__ object instead of a dict per line: long documents produce
+    millions of lines, and the page width is stored once on the page
+    record ("width") rather than repeated on every line.
+
+    - text: cleaned line text
+    - alignment: "left" | "center" | "right" (shared string constants)
+    - x: left edge of the line
+    - right: right edge of the line (0.0 when unknown)
+    - y: top edge of the line, measured from the top of the page
+    - size: font size (0.0 when the backend does not report one)
+    """
+
+    __slots__ = ("text", "alignment", "x", "y", "size", "right")
+
+    def __init__(self, text: str, alignment: str = "left", x: float = 0.0, y: float = 0.0,
+                 size: float = 0.0, right: float = 0.0):
+        self.text = text
+        self.alignment = alignment
+        self.x = x
+        self.y = y
+        self.size = size
+        self.right = right
+
+    def __reduce__(self):
+        # Compact pickling for lines sent back from parallel extraction workers
+        return TextLine, (self.text, self.alignment, self.x, self.y, self.size, self.right)
+
+    def __eq__(self, other):
+        if not isinstance(other, TextLine):
+            return NotImplemented
+        return self.__reduce__()[1] == other.__reduce__()[1]
+
+    def __repr__(self):
+        return f"TextLine({self.text!r}, {self.alignment!r}, x={self.x:.1f}, y={self.y:.1f}, size={self.size:.1f})"
+
+
+def line_text(line) -> str:
+    """
+    Text of a line, whether it is a TextLine or a plain string
+    (pdfplumber's plain-text pages yield strings).
+    """
+    return line if isinstance(line, str) else line.text
+
+
+def as_text_line(line) -> TextLine:
+    return TextLine(line) if isinstance(line, str) else line
@@ -0,0 +1,232 @@
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+
+# Histogram buckets (seconds) shared by all latency metrics
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+THROUGHPUT_BUCKETS = (1, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+
+# -------------------------------------------------
+# PER-CONVERSION COLLECTION
+# -------------------------------------------------
+class StageCollector:
+    """
+    Collects stage timings and event counts for one conversion.
+
+    Stages may nest (e.g. heading grouping pulls pages from extraction),
+    so every stage records its self time: nested stages are subtracted
+    from the stage that was running around them.
+    """
+
+    def __init__(self):
+        self.timings = {}
+        self.counters = {}
+        self._stack = []
+
+    def enter(self, name):
+        self._stack.append([name, time.perf_counter(), 0.0])
+
+    def exit(self):
+        name, started, child_time = self._stack.pop()
+        elapsed = time.perf_counter() - started
+
+        self.timings[name] = self.timings.get(name, 0.0) + elapsed - child_time
+        if self._stack:
+            self._stack[-1][2] += elapsed
+
+    def count(self, name, amount=1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+
+_collector = ContextVar("pdf_stage_collector", default=None)
+
+
+@contextmanager
+def collect_stages():
+    """
+    Activates a StageCollector for everything run inside the block.
+    """
+    collector = StageCollector()
+    token = _collector.set(collector)
+    try:
+        yield collector
+    finally:
+        _collector.reset(token)
+
+
+@contextmanager
+def stage(name: str):
+    """
+    Instrumentation hook: times the block as `name` when a collector is active,
+    costs next to nothing otherwise.
+    """
+    collector = _collector.get()
+    if collector is None:
+        yield
+        return
+
+    collector.enter(name)
+    try:
+        yield
+    finally:
+        collector.exit()
+
+
+def count(name: str, amount: int = 1):
+    """
+    Instrumentation hook: counts an event (e.g. a fallback) for the active collector.
+    """
+    collector = _collector.get()
+    if collector is not None:
+        collector.count(name, amount)
+
+
+def merge_stages(timings: dict, counters: dict):
+    """
+    Adds timings/counters collected elsewhere (e.g. in a worker process)
+    to the active collector.
+    """
+    collector = _collector.get()
+    if collector is None:
+        return
+
+    for name, seconds in timings.items():
+        collector.timings[name] = collector.timings.get(name, 0.0) + seconds
+    for name, amount in counters.items():
+        collector.count(name, amount)
+
+
+def server_timing(timings: dict) -> str:
+    """
+    Formats stage timings as a Server-Timing header value (milliseconds).
+    """
+    return ", ".join(f"{name};dur={seconds * 1000:.1f}" for name, seconds in timings.items())
+
+
+# -------------------------------------------------
+# PROCESS-WIDE REGISTRY
+# -------------------------------------------------
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.total = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.total += 1
+        self.sum += value
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+
+
+class MetricsRegistry:
+    """
+    Counters and histograms for the API, rendered in Prometheus text format.
+    Metrics are keyed by (name, labels) where labels is a tuple of pairs.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+        self._help = {}
+
+    def describe(self, name, text):
+        self._help[name] = text
+
+    def inc(self, name, amount=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def observe(self, name, value, buckets=LATENCY_BUCKETS, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(buckets)
+            histogram.observe(value)
+
+    def record_conversion(self, timings: dict, counters: dict, pages: int,
+                          bytes_in: int, bytes_out: int, seconds: float):
+        """
+        Feeds the result of one finished conversion into the registry.
+        """
+        for name, stage_seconds in timings.items():
+            self.observe("pdf_stage_seconds", stage_seconds, stage=name)
+        for name, amount in counters.items():
+            self.inc("pdf_events_total", amount, event=name)
+
+        self.observe("pdf_conversion_seconds", seconds)
+        if seconds > 0 and pages:
+            self.observe("pdf_conversion_pages_per_second", pages / seconds, buckets=THROUGHPUT_BUCKETS)
+
+        self.inc("pdf_conversions_total")
+        self.inc("pdf_pages_total", pages)
+        self.inc("pdf_bytes_in_total", bytes_in)
+        self.inc("pdf_bytes_out_total", bytes_out)
+
+    def render(self, gauges: dict = None, counters: dict = None) -> str:
+        """
+        Prometheus text exposition. gauges / counters: extra
+        {name: value or {labels: value}} sampled at scrape time
+        (in-flight jobs, cache hit counters kept by the cache, ...).
+        """
+        lines = []
+        seen = set()
+
+        def header(name, kind):
+            if name in seen:
+                return
+            seen.add(name)
+            if name in self._help:
+                lines.append(f"# HELP {name} {self._help[name]}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        with self._lock:
+            for (name, labels), value in sorted(self._counters.items()):
+                header(name, "counter")
+                lines.append(f"{name}{_labels(labels)} {value}")
+
+            for (name, labels), histogram in sorted(self._histograms.items()):
+                header(name, "histogram")
+                for bound, bucket_count in zip(histogram.buckets, histogram.counts):
+                    lines.append(f"{name}_bucket{_labels(labels + (('le', bound),))} {bucket_count}")
+                lines.append(f"{name}_bucket{_labels(labels + (('le', '+Inf'),))} {histogram.total}")
+                lines.append(f"{name}_sum{_labels(labels)} {histogram.sum}")
+                lines.append(f"{name}_count{_labels(labels)} {histogram.total}")
+
+        sampled = [(name, value, "counter") for name, value in (counters or {}).items()]
+        sampled += [(name, value, "gauge") for name, value in (gauges or {}).items()]
+
+        for name, value, kind in sampled:
+            header(name, kind)
+            if isinstance(value, dict):
+                for labels, labelled_value in value.items():
+                    lines.append(f"{name}{_labels(labels)} {labelled_value}")
+            else:
+                lines.append(f"{name} {value}")
+
+        return "\n".join(lines) + "\n"
+
+
+def _labels(labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{value}"' for key, value in labels) + "}"
+
+
+REGISTRY = MetricsRegistry()
+REGISTRY.describe("pdf_stage_seconds", "Self time spent in each pipeline stage per conversion")
+REGISTRY.describe("pdf_conversion_seconds", "Wall time of a full conversion")
+REGISTRY.describe("pdf_conversion_pages_per_second", "Pages converted per second, per conversion")
+REGISTRY.describe("pdf_events_total", "Pipeline events such as backend fallbacks")
+REGISTRY.describe("pdf_conversions_total", "Finished conversions")
+REGISTRY.describe("pdf_pages_total", "Pages converted")
+REGISTRY.describe("pdf_bytes_in_total", "PDF bytes received for conversion")
+REGISTRY.describe("pdf_bytes_out_total", "DOCX bytes produced")
@@ -0,0 +1,64 @@
+import importlib
+import os
+
+from app.core.pdf_lines import as_text_line, line_text
+
+
+# OCR engine for image-only pages, as "module:function" (empty = no OCR).
+# The function is called with the PNG bytes of a rendered page and returns
+# its text lines in reading order (strings or TextLine objects).
+OCR_ENGINE = os.getenv("PDF_OCR_ENGINE", "")
+OCR_DPI = int(os.getenv("PDF_OCR_DPI", "300"))
+
+# Loaded on first use, once per process (extraction workers load their own)
+_engine = None
+_engine_loaded = False
+
+
+def set_ocr_engine(engine):
+    """
+    Attaches an OCR engine in this process, overriding PDF_OCR_ENGINE.
+    None detaches it. Worker processes only see PDF_OCR_ENGINE.
+    """
+    global _engine, _engine_loaded
+    _engine = engine
+    _engine_loaded = True
+
+
+def ocr_engine():
+    """
+    The configured OCR callable, or None.
+    """
+    global _engine, _engine_loaded
+    if _engine_loaded:
+        return _engine
+
+    _engine_loaded = True
+    if not OCR_ENGINE:
+        return None
+
+    try:
+        module_name, _, attr = OCR_ENGINE.partition(":")
+        _engine = getattr(importlib.import_module(module_name), attr or "recognize")
+    except Exception as e:
+        print(f"Warning: OCR engine {OCR_ENGINE!r} could not be loaded ({e}), image-only pages stay empty")
+        _engine = None
+
+    return _engine
+
+
+def ocr_page_lines(page) -> list:
+    """
+    Runs the OCR engine over one PyMuPDF page. Returns TextLine objects,
+    empty when no engine is attached or the engine failed.
+    """
+    engine = ocr_engine()
+    if engine is None:
+        return []
+
+    try:
+        image = page.get_pixmap(dpi=OCR_DPI).tobytes("png")
+        return [as_text_line(line) for line in engine(image) or [] if line_text(line).strip()]
+    except Exception as e:
+        print(f"Warning: OCR failed on page {page.number + 1}: {e}")
+        return []
@@ -0,0 +1,130 @@
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+
+
+# Extracted pages kept per process, keyed by page fingerprint (0 = no page cache)
+PAGE_CACHE_SIZE = int(os.getenv("PDF_PAGE_CACHE_SIZE", "2048"))
+
+# Indirect reference inside a PDF object ("12 0 R")
+OBJECT_REFERENCE = re.compile(r"(\d+) \d+ R\b")
+
+
+class PageCache:
+    """
+    LRU of extraction results per page, keyed by page fingerprint.
+
+    Documents generated from the same template share most of their
+    pages byte for byte: those pages are extracted once, later
+    documents only extract the pages that changed. Entries are counted,
+    not sized, a page record is a few kilobytes.
+    """
+
+    def __init__(self, max_size=PAGE_CACHE_SIZE):
+        self.max_size = max(0, max_size)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0
+
+    def get(self, key):
+        if key is None:
+            return None
+
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        if key is None or not self.max_size:
+            return
+
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+PAGE_CACHE = PageCache()
+
+
+class PageFingerprinter:
+    """
+    Content fingerprints for the pages of one open PyMuPDF document.
+
+    A fingerprint covers everything text extraction depends on, none
+    of it tied to the document's object numbers:
+    - page box and rotation
+    - the decompressed content stream
+    - fonts and XObjects by resource name and resolved object (see
+      _resolved): the font dictionary with its encoding and Differences,
+      Widths, descendant fonts, font descriptor, embedded font program
+      and ToUnicode map, form XObjects with their content and resources
+    - of images only the dictionary (size, color space, ...), their pixels
+      only matter to OCR, and image-only pages are not cached
+
+    Objects are shared between pages, each one is hashed once per document.
+    """
+
+    def __init__(self, doc):
+        self.doc = doc
+        self._resolved = {}
+
+    def fingerprint(self, page) -> str:
+        digest = hashlib.sha1()
+        digest.update(repr((tuple(page.rect), page.rotation)).encode("ascii"))
+        digest.update(page.read_contents())
+
+        for xref, _, _, _, name, _ in page.get_fonts():
+            digest.update(repr((name, self._resolved_hash(xref))).encode("utf-8"))
+
+        for xref, name, _, _ in page.get_xobjects():
+            digest.update(repr((name, self._resolved_hash(xref))).encode("utf-8"))
+
+        for image in page.get_images():
+            digest.update(repr((image[7], self._resolved_hash(image[0]))).encode("utf-8"))
+
+        return digest.hexdigest()
+
+    def _resolved_hash(self, xref: int) -> str:
+        """
+        Hash of an object with every reference in it replaced by the hash
+        of the referenced object, and the raw bytes of non-image streams.
+        """
+        resolved = self._resolved.get(xref)
+        if resolved is not None:
+            return resolved
+
+        doc = self.doc
+        # Marks the object while it is hashed, a reference cycle ends here
+        self._resolved[xref] = "cycle"
+
+        try:
+            source = doc.xref_object(xref, compressed=True)
+        except Exception:
+            source = ""
+
+        digest = hashlib.sha1(
+            OBJECT_REFERENCE.sub(lambda match: self._resolved_hash(int(match.group(1))), source).encode("utf-8")
+        )
+
+        if source and doc.xref_is_stream(xref) and doc.xref_get_key(xref, "Subtype") != ("name", "/Image"):
+            # Raw bytes, the filters that decode them are part of the dictionary
+            digest.update(doc.xref_stream_raw(xref) or b"")
+
+        resolved = self._resolved[xref] = digest.hexdigest()
+        return resolved
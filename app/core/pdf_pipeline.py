@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import importlib
+import os
+import time
+from io import BytesIO
+from typing import TYPE_CHECKING
+
+from app.core.pdf_contentType import DocumentStructurer
+from app.core.pdf_toWordXml import DOCX_WRITER, WordXmlWriter
+from app.core.pdf_metrics import collect_stages, stage
+from app.core.pdf_ocr import OCR_ENGINE
+
+# PyMuPDF, pdfplumber, pdfminer and python-docx take most of the import
+# time, they are loaded on first use so importing the API stays cheap
+if TYPE_CHECKING:
+    from app.core.pdf_extract import PdfSource
+
+
+# Extraction settings that change the output. Their modules load the PDF
+# libraries, so the variables are read as they are set in the environment
+# (setting one to its default only costs a cache miss, never a stale file)
+OUTPUT_SETTINGS = (
+    "PDF_EXTRACTION_MODE",
+    "PDF_PRESCAN_PAGES",
+    "PDF_COMPARE_DECIDE_PAGES",
+    "PDF_TABLE_EXTRACTION",
+    "PDF_LAYOUT_ANALYSIS",
+)
+
+# Bump whenever extraction, structuring or Word output changes,
+# so cached conversions from an older pipeline are not served.
+# The writer backend is part of it, both write different (equivalent) files,
+# and so is the OCR engine, which changes the text of scanned pages, and
+# every output setting that is set.
+PIPELINE_VERSION = f"6-{DOCX_WRITER}" + (f"-ocr:{OCR_ENGINE}" if OCR_ENGINE else "") + "".join(
+    f"-{name}={os.environ[name]}" for name in OUTPUT_SETTINGS if name in os.environ
+)
+
+# Modules that pull in the heavy PDF and Word libraries
+BACKEND_MODULES = ("app.core.pdf_extract", "app.core.pdf_toWord")
+
+
+def warm_up() -> float:
+    """
+    Imports the extraction and Word backends ahead of the first
+    conversion. Returns the seconds it took (close to 0 once loaded).
+    """
+    started = time.perf_counter()
+    for module in BACKEND_MODULES:
+        importlib.import_module(module)
+    return time.perf_counter() - started
+
+
+def run_pipeline(source: PdfSource, progress=None, on_section=None) -> dict:
+    """
+    Runs the full extract -> group -> build chain.
+
+    Pages are structured as they are extracted. With the XML writer
+    every section is also rendered as soon as the next heading closes
+    it, overlapping extraction, structuring and document building.
+
+    progress: optional callback, called with the page number of every
+    page as soon as it has been extracted.
+    on_section: optional callback, called with (heading, lines) of every
+    section as soon as it is complete.
+
+    Returns:
+    {
+        "docx": DOCX file bytes,
+        "structured": output of group_content_under_headings,
+        "source": extractor(s) used,
+        "pages": number of pages,
+        "image_pages": page numbers of image-only (scanned) pages,
+        "seconds": wall time of the conversion,
+        "timings": {stage: self time in seconds},
+        "counters": {event: count}  (fallbacks, backend choice, ...)
+    }
+
+    Kept as a plain top-level function so it can be pickled and
+    shipped to a process pool worker.
+    """
+    from app.core.pdf_extract import iter_document_pages, iter_text_lines, source_label
+
+    page_sources = []
+    image_pages = []
+    started = time.perf_counter()
+
+    structurer = DocumentStructurer()
+    docx_buffer = BytesIO()
+    writer = WordXmlWriter(docx_buffer) if DOCX_WRITER == "xml" else None
+
+    def emit(sections):
+        for heading, lines in sections:
+            if writer:
+                with stage("build_docx"):
+                    if not writer.started:
+                        writer.start(structurer.title)
+                    writer.add_section(heading, lines)
+            if on_section:
+                on_section(heading, lines)
+
+    with collect_stages() as collector:
+        # Pages stream straight from extraction into structuring,
+        # only the backend name of each page is kept
+        for page in iter_document_pages(source):
+            page_sources.append(page["source"])
+            if page["image_only"]:
+                image_pages.append(page["page_number"])
+            if progress:
+                progress(page["page_number"])
+
+            with stage("structure"):
+                closed = structurer.feed(iter_text_lines([page]))
+            emit(closed)
+
+        with stage("structure"):
+            closed = structurer.close()
+        emit(closed)
+
+        structured = structurer.result()
+        extractor = source_label(page_sources)
+
+        if writer:
+            with stage("build_docx"):
+                # A document without sections still has its title
+                if not writer.started:
+                    writer.start(structurer.title)
+                writer.close()
+        else:
+            from app.core.pdf_toWord import build_word_document
+            build_word_document(structured, docx_buffer)
+
+    return {
+        "docx": docx_buffer.getvalue(),
+        "structured": structured,
+        "source": extractor,
+        "pages": len(page_sources),
+        "image_pages": image_pages,
+        "seconds": time.perf_counter() - started,
+        "timings": collector.timings,
+        "counters": collector.counters
+    }
+
+
+def convert_pdf(source: PdfSource) -> bytes:
+    """
+    Runs the full pipeline and returns only the DOCX bytes.
+    source can be a path or the PDF bytes themselves.
+    """
+    return run_pipeline(source)["docx"]
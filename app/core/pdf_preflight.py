@@ -0,0 +1,69 @@
+import os
+
+
+# Admission budgets (override through environment variables, 0 = no limit)
+MAX_PAGES = int(os.getenv("PDF_MAX_PAGES", "2000"))
+MAX_BYTES = int(os.getenv("PDF_MAX_BYTES", str(100 * 1024 * 1024)))
+
+# Cost model, in estimated conversion seconds. Pages without text
+# end up on the slower fallback backends.
+TEXT_PAGE_COST = 0.01
+SCANNED_PAGE_COST = 0.1
+MEGABYTE_COST = 0.02
+
+# Pages looked at to decide whether the document has text
+TEXT_SAMPLE_PAGES = 3
+
+
+class JobTooLargeError(Exception):
+    """Raised when a PDF is over the page or byte budget."""
+
+
+class InvalidPdfError(Exception):
+    """Raised when a PDF cannot be opened at all."""
+
+
+def preflight(pdf_bytes: bytes) -> dict:
+    """
+    Cheap look at a PDF before it is queued for conversion.
+
+    Only the file size, the page tree and the font lists of the first
+    TEXT_SAMPLE_PAGES pages are read, no page content is parsed.
+    Raises JobTooLargeError over the MAX_PAGES / MAX_BYTES budgets and
+    InvalidPdfError when the PDF cannot be opened.
+
+    Returns:
+    {
+        "pages": page count,
+        "bytes": file size,
+        "has_text": whether the sampled pages use any font,
+        "cost": estimated conversion seconds (for scheduling, not a promise)
+    }
+    """
+    size = len(pdf_bytes)
+    if MAX_BYTES and size > MAX_BYTES:
+        raise JobTooLargeError(f"PDF is {size / 1048576:.1f} MB, the limit is {MAX_BYTES / 1048576:.0f} MB")
+
+    # PyMuPDF is loaded on first use, like the rest of the PDF backends
+    import fitz
+
+    try:
+        doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+    except Exception as e:
+        raise InvalidPdfError(f"Not a readable PDF: {e}")
+
+    with doc:
+        pages = doc.page_count
+        has_text = any(doc.get_page_fonts(index) for index in range(min(pages, TEXT_SAMPLE_PAGES)))
+
+    if MAX_PAGES and pages > MAX_PAGES:
+        raise JobTooLargeError(f"PDF has {pages} pages, the limit is {MAX_PAGES}")
+
+    page_cost = TEXT_PAGE_COST if has_text else SCANNED_PAGE_COST
+
+    return {
+        "pages": pages,
+        "bytes": size,
+        "has_text": has_text,
+        "cost": pages * page_cost + size / 1048576 * MEGABYTE_COST
+    }
@@ -1,8 +1,13 @@
+from itertools import chain, repeat
+
 from docx import Document
 from docx.shared import Pt, Inches
 from docx.enum.text import WD_ALIGN_PARAGRAPH
 from docx.oxml import OxmlElement, ns
 
+from app.core.pdf_metrics import stage
+from app.core.pdf_toWordXml import DOCX_WRITER, build_word_document_xml
+
 
 # -------------------------------------------------
 # TABLE BORDER HELPER
@@ -63,13 +68,18 @@ def align_cell(cell, alignment: str):
 def add_form_table(document, table_data):
     """
     Adds a bordered, aligned form-style table to the document.
+
+    Rows may have different lengths (merged cells), short rows are
+    padded. The table is created at its final size and its cells are
+    filled in one pass over the flat cell list, instead of looking
+    every cell up with table.cell(row, col).
     """
     # Skip if no table data
     if not table_data or len(table_data) == 0:
         return
-    
+
     rows = len(table_data)
-    cols = len(table_data[0])
+    cols = max(len(row) for row in table_data)
 
     table = document.add_table(rows=rows, cols=cols)
 
@@ -86,14 +96,15 @@ def add_form_table(document, table_data):
             [Inches(0.6), Inches(2.5), Inches(3.0)]
         )
 
-    # Fill table cells
-    for r_idx, row in enumerate(table_data):
-        for c_idx, cell_value in enumerate(row):
-            cell = table.cell(r_idx, c_idx)
-            cell.text = cell_value or ""
+    # Fill table cells (row-major, same order as table._cells)
+    values = chain.from_iterable(
+        chain(row, repeat("", cols - len(row))) for row in table_data
+    )
+    for cell, cell_value in zip(table._cells, values):
+        cell.text = cell_value or ""
 
-            # Default alignment for form tables
-            align_cell(cell, "left")
+        # Default alignment for form tables
+        align_cell(cell, "left")
 
     return table
 
@@ -101,14 +112,30 @@ def add_form_table(document, table_data):
 # -------------------------------------------------
 # MAIN WORD DOCUMENT BUILDER
 # -------------------------------------------------
-def build_word_document(structured_doc: dict, output_path: str, aligned_lines=None):
+def build_word_document(structured_doc: dict, output_path: str, aligned_lines=None, writer: str = None):
 
     """
     Builds a Word document from structured text and tables.
 
     Input:
-    - structured_doc: output of STEP 2 (text classification)
+    - structured_doc: output of STEP 2 (text classification), tables
+      are the list entries (rows of cells) of a section
     - output_path: path to save .docx file
+    - aligned_lines: optional TextLine list (extract_lines_with_alignment),
+      the alignment of each body line is taken from it in order
+    - writer: "python-docx" or "xml" (default: DOCX_WRITER)
+    """
+
+    if (writer or DOCX_WRITER) == "xml":
+        return build_word_document_xml(structured_doc, output_path, aligned_lines)
+
+    return build_word_document_docx(structured_doc, output_path, aligned_lines)
+
+
+@stage("build_docx")
+def build_word_document_docx(structured_doc: dict, output_path: str, aligned_lines=None):
+    """
+    python-docx implementation of build_word_document.
     """
 
     document = Document()
@@ -136,12 +163,17 @@ def build_word_document(structured_doc: dict, output_path: str, aligned_lines=No
         heading_run.font.size = Pt(12)
         
         for idx, line in enumerate(lines):
+            # Extracted tables sit between the lines of their section
+            if isinstance(line, list):
+                add_form_table(document, line)
+                continue
+
             para = document.add_paragraph(line)
             para.paragraph_format.space_after = Pt(6)
 
             # Apply semantic alignment if available
             if aligned_lines and line_counter < len(aligned_lines):
-                align = aligned_lines[line_counter].get("alignment", "left")
+                align = aligned_lines[line_counter].alignment
 
                 if align == "right":
                     para.alignment = WD_ALIGN_PARAGRAPH.RIGHT
@@ -152,20 +184,8 @@ def build_word_document(structured_doc: dict, output_path: str, aligned_lines=No
 
             line_counter += 1
 
-
-
-
-    # -------------------------
-    # EXAMPLE: FORM TABLE INSERTION
-    # (replace table_data with extracted table later)
-    # -------------------------
-    table_data = [
-    
-    ]
-
-    add_form_table(document, table_data)
-
     # -------------------------
     # SAVE DOCUMENT
     # -------------------------
-    document.save(output_path)
+    with stage("save_docx"):
+        document.save(output_path)
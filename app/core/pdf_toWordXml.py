@@ -0,0 +1,263 @@
+import os
+import zipfile
+from xml.sax.saxutils import escape
+
+from app.core.pdf_metrics import stage
+
+
+# Word writer backend: "python-docx" (object model) or "xml" (streams XML directly, much faster).
+# Defined here rather than in pdf_toWord so reading it does not import python-docx.
+DOCX_WRITER = os.getenv("PDF_DOCX_WRITER", "python-docx")
+
+# Flush document.xml into the zip whenever this much XML is buffered
+CHUNK_SIZE = 64 * 1024
+
+W_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+R_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+
+
+# -------------------------------------------------
+# STATIC PACKAGE PARTS
+# -------------------------------------------------
+CONTENT_TYPES_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/word/document.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+    '<Override PartName="/word/styles.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.styles+xml"/>'
+    '</Types>'
+)
+
+ROOT_RELS_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="word/document.xml"/>'
+    '</Relationships>'
+)
+
+DOCUMENT_RELS_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" '
+    'Target="styles.xml"/>'
+    '</Relationships>'
+)
+
+# Same defaults as python-docx's template: Calibri 11pt, 10pt after, 1.15 line spacing
+STYLES_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    f'<w:styles xmlns:w="{W_NS}">'
+    '<w:docDefaults>'
+    '<w:rPrDefault><w:rPr>'
+    '<w:rFonts w:ascii="Calibri" w:eastAsia="Calibri" w:hAnsi="Calibri" w:cs="Calibri"/>'
+    '<w:sz w:val="22"/><w:szCs w:val="22"/><w:lang w:val="en-US"/>'
+    '</w:rPr></w:rPrDefault>'
+    '<w:pPrDefault><w:pPr><w:spacing w:after="200" w:line="276" w:lineRule="auto"/></w:pPr></w:pPrDefault>'
+    '</w:docDefaults>'
+    '<w:style w:type="paragraph" w:default="1" w:styleId="Normal"><w:name w:val="Normal"/><w:qFormat/></w:style>'
+    '<w:style w:type="table" w:default="1" w:styleId="TableNormal"><w:name w:val="Normal Table"/>'
+    '<w:tblPr><w:tblInd w:w="0" w:type="dxa"/><w:tblCellMar>'
+    '<w:top w:w="0" w:type="dxa"/><w:left w:w="108" w:type="dxa"/>'
+    '<w:bottom w:w="0" w:type="dxa"/><w:right w:w="108" w:type="dxa"/>'
+    '</w:tblCellMar></w:tblPr></w:style>'
+    '<w:style w:type="table" w:styleId="TableGrid"><w:name w:val="Table Grid"/><w:basedOn w:val="TableNormal"/>'
+    '<w:pPr><w:spacing w:after="0" w:line="240" w:lineRule="auto"/></w:pPr>'
+    '<w:tblPr><w:tblBorders>'
+    '<w:top w:val="single" w:sz="4" w:space="0" w:color="auto"/>'
+    '<w:left w:val="single" w:sz="4" w:space="0" w:color="auto"/>'
+    '<w:bottom w:val="single" w:sz="4" w:space="0" w:color="auto"/>'
+    '<w:right w:val="single" w:sz="4" w:space="0" w:color="auto"/>'
+    '<w:insideH w:val="single" w:sz="4" w:space="0" w:color="auto"/>'
+    '<w:insideV w:val="single" w:sz="4" w:space="0" w:color="auto"/>'
+    '</w:tblBorders></w:tblPr></w:style>'
+    '</w:styles>'
+)
+
+DOCUMENT_START = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    f'<w:document xmlns:w="{W_NS}" xmlns:r="{R_NS}"><w:body>'
+)
+
+# Letter page with 1.25" side margins, same section as python-docx's template
+DOCUMENT_END = (
+    '<w:sectPr>'
+    '<w:pgSz w:w="12240" w:h="15840"/>'
+    '<w:pgMar w:top="1440" w:right="1800" w:bottom="1440" w:left="1800" '
+    'w:header="720" w:footer="720" w:gutter="0"/>'
+    '<w:cols w:space="720"/>'
+    '</w:sectPr>'
+    '</w:body></w:document>'
+)
+
+# Legal-form column widths in twentieths of a point (0.6", 2.5", 3.0")
+FORM_COLUMN_WIDTHS = [864, 3600, 4320]
+
+TABLE_BORDERS = "".join(
+    f'<w:{edge} w:val="single" w:sz="12" w:space="0" w:color="000000"/>'
+    for edge in ("top", "left", "bottom", "right", "insideH", "insideV")
+)
+
+
+# -------------------------------------------------
+# XML FRAGMENTS
+# -------------------------------------------------
+def text_run(text: str, bold: bool = False, size_pt: int = None) -> str:
+    props = ""
+    if bold:
+        props += "<w:b/>"
+    if size_pt:
+        props += f'<w:sz w:val="{size_pt * 2}"/>'
+    if props:
+        props = f"<w:rPr>{props}</w:rPr>"
+
+    return f'<w:r>{props}<w:t xml:space="preserve">{escape(text)}</w:t></w:r>'
+
+
+def paragraph(text: str = "", alignment: str = None, space_after_pt: int = None,
+              bold: bool = False, size_pt: int = None) -> str:
+    props = ""
+    if space_after_pt is not None:
+        props += f'<w:spacing w:after="{space_after_pt * 20}"/>'
+    if alignment in ("left", "center", "right"):
+        props += f'<w:jc w:val="{alignment}"/>'
+    if props:
+        props = f"<w:pPr>{props}</w:pPr>"
+
+    run = text_run(text, bold, size_pt) if text else ""
+    return f"<w:p>{props}{run}</w:p>"
+
+
+def table(table_data) -> str:
+    """
+    Bordered form-style table, same layout as pdf_toWord.add_form_table.
+    All rows are rendered in one pass, no per-cell object model.
+    """
+    if not table_data:
+        return ""
+
+    cols = max(len(row) for row in table_data)
+    widths = FORM_COLUMN_WIDTHS if cols == 3 else None
+
+    grid = "".join(f'<w:gridCol w:w="{width}"/>' for width in widths) if widths else "<w:gridCol/>" * cols
+    parts = [
+        '<w:tbl><w:tblPr><w:tblStyle w:val="TableGrid"/><w:tblW w:w="0" w:type="auto"/>',
+        f"<w:tblBorders>{TABLE_BORDERS}</w:tblBorders></w:tblPr>",
+        f"<w:tblGrid>{grid}</w:tblGrid>",
+    ]
+
+    for row in table_data:
+        parts.append("<w:tr>")
+        for c_idx in range(cols):
+            cell_value = row[c_idx] if c_idx < len(row) else ""
+            width = f'<w:tcW w:w="{widths[c_idx]}" w:type="dxa"/>' if widths else ""
+            parts.append(f"<w:tc><w:tcPr>{width}</w:tcPr>{paragraph(cell_value or '', 'left')}</w:tc>")
+        parts.append("</w:tr>")
+
+    parts.append("</w:tbl>")
+    return "".join(parts)
+
+
+class WordXmlWriter:
+    """
+    Incremental document.xml writer.
+
+    Sections can be added as soon as they are complete, so the document
+    is rendered while later pages are still being extracted:
+
+        writer = WordXmlWriter(output)
+        writer.start(title)
+        writer.add_section(heading, lines)   # any number of times
+        writer.close()
+    """
+
+    def __init__(self, output_path, aligned_lines=None):
+        self.aligned_lines = aligned_lines
+        self.started = False
+
+        self._line_counter = 0
+        self._buffer = []
+        self._buffered = 0
+
+        self._package = zipfile.ZipFile(output_path, "w", zipfile.ZIP_DEFLATED)
+        self._package.writestr("[Content_Types].xml", CONTENT_TYPES_XML)
+        self._package.writestr("_rels/.rels", ROOT_RELS_XML)
+        self._package.writestr("word/_rels/document.xml.rels", DOCUMENT_RELS_XML)
+        self._package.writestr("word/styles.xml", STYLES_XML)
+
+        self._document = self._package.open("word/document.xml", "w")
+
+    def start(self, title: str):
+        self._write(DOCUMENT_START)
+
+        # TITLE
+        if title:
+            self._write(paragraph(title, "center", bold=True, size_pt=16))
+
+        self._write(paragraph(""))
+        self.started = True
+
+    def add_section(self, heading: str, lines):
+        self._write(paragraph(heading, bold=True, size_pt=12))
+
+        aligned_lines = self.aligned_lines
+        for line in lines:
+            # Extracted tables sit between the lines of their section
+            if isinstance(line, list):
+                self._write(table(line))
+                continue
+
+            alignment = None
+            if aligned_lines and self._line_counter < len(aligned_lines):
+                alignment = aligned_lines[self._line_counter].alignment
+
+            self._write(paragraph(line, alignment, space_after_pt=6))
+            self._line_counter += 1
+
+    def close(self):
+        if not self.started:
+            self.start("")
+
+        self._write(DOCUMENT_END)
+
+        self._flush()
+        self._document.close()
+        self._package.close()
+
+    def _write(self, fragment: str):
+        self._buffer.append(fragment)
+        self._buffered += len(fragment)
+
+        if self._buffered >= CHUNK_SIZE:
+            self._flush()
+
+    def _flush(self):
+        self._document.write("".join(self._buffer).encode("utf-8"))
+        self._buffer = []
+        self._buffered = 0
+
+
+# -------------------------------------------------
+# MAIN WORD DOCUMENT BUILDER
+# -------------------------------------------------
+@stage("build_docx")
+def build_word_document_xml(structured_doc: dict, output_path, aligned_lines=None):
+    """
+    Writes the same document as pdf_toWord.build_word_document, but
+    streams WordprocessingML straight into the zip instead of building
+    python-docx's lxml object model. output_path can be a path or a
+    writable binary file object.
+    """
+    writer = WordXmlWriter(output_path, aligned_lines)
+    writer.start(structured_doc.get("title"))
+
+    # SECTIONS (TEXT)
+    for heading, lines in structured_doc["sections"].items():
+        writer.add_section(heading, lines)
+
+    writer.close()
@@ -0,0 +1,305 @@
+import asyncio
+import heapq
+import itertools
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from functools import partial
+
+
+# Execution settings (override through environment variables)
+POOL_MODE = os.getenv("PDF_POOL_MODE", "process")              # "process" or "thread"
+POOL_WORKERS = int(os.getenv("PDF_POOL_WORKERS", str(os.cpu_count() or 1)))
+POOL_QUEUE_LIMIT = int(os.getenv("PDF_POOL_QUEUE_LIMIT", "16"))  # jobs allowed to wait for a worker
+JOB_TIMEOUT = float(os.getenv("PDF_JOB_TIMEOUT", "120"))        # seconds, per upload
+
+# Scheduling: waiting jobs start smallest estimated cost first. Every second
+# a job waits counts as this many seconds of cost less, so large jobs still
+# get their turn while small ones keep arriving.
+SCHEDULER_AGING = float(os.getenv("PDF_SCHEDULER_AGING", "1.0"))
+
+# Conversions one client may have in flight at once (0 = no limit)
+CLIENT_MAX_CONVERSIONS = int(os.getenv("PDF_CLIENT_MAX_CONVERSIONS", "4"))
+
+
+# Modules imported once by the forkserver, every worker process starts with them loaded
+WORKER_PRELOAD = ["app.core.pdf_pipeline", "app.core.pdf_extract"]
+
+_process_context = None
+
+
+class PoolBusyError(Exception):
+    """Raised when the waiting queue is full and the job is rejected."""
+
+
+class JobTimeoutError(Exception):
+    """Raised when a job does not finish within the configured timeout."""
+
+
+class ClientBusyError(Exception):
+    """Raised when a client already has its maximum of conversions in flight."""
+
+
+def schedule_key(cost: float, enqueued_at: float) -> float:
+    """
+    Priority of a waiting job, lowest first (see SCHEDULER_AGING).
+    """
+    return cost + SCHEDULER_AGING * enqueued_at
+
+
+def process_context():
+    """
+    Start method for worker processes (conversion pool and page shards).
+    Workers are started from a forkserver (spawn where there is none) with
+    WORKER_PRELOAD imported: forking the server process could copy locks
+    held by its other threads (event loop, to_thread pool, job workers)
+    and deadlock.
+    """
+    global _process_context
+    if _process_context is None:
+        try:
+            _process_context = multiprocessing.get_context("forkserver")
+            _process_context.set_forkserver_preload(WORKER_PRELOAD)
+        except ValueError:
+            _process_context = multiprocessing.get_context("spawn")
+
+    return _process_context
+
+
+class ConversionPool:
+    """
+    Runs blocking conversion work off the event loop.
+
+    - At most `workers` jobs run at the same time
+    - At most `queue_limit` more jobs may wait for a free worker
+    - Anything beyond that is rejected straight away (PoolBusyError)
+    - Each job is given `timeout` seconds before the caller gives up,
+      the job keeps its worker until it actually finishes
+    - A process pool broken by a dying worker (OOM kill, crash in a
+      native library) is replaced on the next job
+    - A free worker goes to the waiting job with the lowest estimated
+      cost (shortest job first, with aging, see schedule_key)
+    """
+
+    def __init__(self, mode=POOL_MODE, workers=POOL_WORKERS,
+                 queue_limit=POOL_QUEUE_LIMIT, timeout=JOB_TIMEOUT):
+        self.mode = mode
+        self.workers = max(1, workers)
+        self.queue_limit = max(0, queue_limit)
+        self.timeout = timeout
+
+        self.pending = 0
+        self.running = 0
+        self._executor = None
+        self._waiting = []
+        self._sequence = itertools.count()
+
+    def _get_executor(self):
+        if self._executor is not None:
+            return self._executor
+
+        if self.mode == "process":
+            try:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=process_context())
+            except (OSError, NotImplementedError) as e:
+                # Some serverless sandboxes have no /dev/shm for process pools
+                print(f"Warning: process pool unavailable ({e}), using threads")
+                self.mode = "thread"
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers)
+
+        return self._executor
+
+    @property
+    def in_flight(self) -> int:
+        return self.pending
+
+    async def run(self, fn, *args, cost: float = 0.0, timeout: float = None):
+        """
+        Runs fn(*args) in the pool and returns its result.
+        fn must be a top-level function when running in process mode.
+        cost: estimated run time (pdf_preflight), orders the waiting jobs.
+        timeout: seconds to wait for this job instead of the pool's
+        timeout (0 = no limit).
+        """
+        if timeout is None:
+            timeout = self.timeout
+
+        if self.pending >= self.workers + self.queue_limit:
+            raise PoolBusyError("Conversion queue is full")
+
+        self.pending += 1
+        try:
+            await self._acquire(cost)
+        except BaseException:
+            self.pending -= 1
+            raise
+
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        try:
+            future = loop.run_in_executor(executor, fn, *args)
+        except BaseException as e:
+            self.pending -= 1
+            self._release()
+            if isinstance(e, BrokenProcessPool):
+                self._discard(executor)
+            raise
+
+        # The worker stays taken until the job really ends, a job we gave up
+        # on still occupies it (and its queue place)
+        future.add_done_callback(partial(self._finished, executor))
+
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), timeout or None)
+        except asyncio.TimeoutError:
+            # A running worker cannot be interrupted, we only stop waiting for it
+            raise JobTimeoutError(f"Conversion exceeded {timeout:g}s")
+
+    def _finished(self, executor, future):
+        self.pending -= 1
+        self._release()
+
+        if not future.cancelled() and isinstance(future.exception(), BrokenProcessPool):
+            self._discard(executor)
+
+    def _discard(self, executor):
+        # A worker died and took the whole process pool down, the next job starts a new one
+        if self._executor is executor:
+            print("Warning: conversion worker died, restarting the process pool")
+            self._executor = None
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    async def _acquire(self, cost: float):
+        if self.running < self.workers and not self._waiting:
+            self.running += 1
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiting, (schedule_key(cost, time.monotonic()), next(self._sequence), waiter))
+
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            # The worker may have been handed over just before the cancellation
+            if waiter.done() and not waiter.cancelled():
+                self._release()
+            raise
+
+    def _release(self):
+        # Hand the worker straight to the cheapest waiting job (cancelled ones are skipped)
+        while self._waiting:
+            _, _, waiter = heapq.heappop(self._waiting)
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+
+        self.running -= 1
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls for the same key (e.g. the same PDF
+    uploaded by many users at once).
+
+    - The first caller for a key starts the work, callers arriving
+      while it runs wait for the same result instead of starting their own
+    - An error is raised to every caller that waited for it
+    - The work runs in its own task: a caller that goes away (client
+      disconnect) does not cancel it for the others
+
+    Used from the event loop only, so no locking is needed.
+    """
+
+    def __init__(self):
+        self.leaders = 0
+        self.coalesced = 0
+        self._tasks = {}
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._tasks)
+
+    def __contains__(self, key) -> bool:
+        return key in self._tasks
+
+    async def run(self, key, fn, *args):
+        """
+        Awaits fn(*args) once per key in flight. Returns (result, shared),
+        shared is True when the result came from another caller's call.
+        """
+        task = self._tasks.get(key)
+        shared = task is not None
+
+        if shared:
+            self.coalesced += 1
+        else:
+            self.leaders += 1
+            task = asyncio.ensure_future(fn(*args))
+            self._tasks[key] = task
+            task.add_done_callback(partial(self._done, key))
+
+        return await asyncio.shield(task), shared
+
+    def _done(self, key, task):
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+
+        # Marks the error as retrieved even when every caller went away
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> dict:
+        return {
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+            "in_flight": self.in_flight
+        }
+
+
+class ClientLimiter:
+    """
+    Caps the conversions a single client can have in flight at once,
+    so one client cannot fill the pool's queue on its own.
+    Used from the event loop only, like SingleFlight.
+    """
+
+    def __init__(self, limit=CLIENT_MAX_CONVERSIONS):
+        self.limit = max(0, limit)
+        self._active = {}
+
+    @contextmanager
+    def hold(self, client):
+        """
+        Holds one of the client's slots for the duration of the block.
+        Raises ClientBusyError when all of them are taken. Requests
+        without a client id are not limited.
+        """
+        if not self.limit or client is None:
+            yield
+            return
+
+        active = self._active.get(client, 0)
+        if active >= self.limit:
+            raise ClientBusyError(f"Too many conversions in progress for this client (limit {self.limit})")
+
+        self._active[client] = active + 1
+        try:
+            yield
+        finally:
+            self._active[client] -= 1
+            if not self._active[client]:
+                del self._active[client]
+
+    @property
+    def clients(self) -> int:
+        return len(self._active)
@@ -0,0 +1,185 @@
+"""
+Benchmark harness for the conversion pipeline.
+
+Times every stage on the synthetic corpus, reports throughput and peak
+Python memory, and compares the results against benchmarks/baseline.json.
+
+Usage:
+    python -m benchmarks.bench_pipeline                  # compare with baseline
+    python -m benchmarks.bench_pipeline --quick          # small subset only
+    python -m benchmarks.bench_pipeline --save-baseline  # record a new baseline
+
+Baselines are machine specific, record one on the machine you compare on.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from io import BytesIO
+
+from app.core.pdf_extract import (
+    extract_best_text,
+    extract_text_from_pdf,
+    extract_text_pdfminer,
+    extract_text_pymupdf,
+    pdf_page_count,
+)
+from app.core.pdf_cid import FONT_TABLES
+from app.core.pdf_contentType import group_content_under_headings, line_features
+from app.core.pdf_page_cache import PAGE_CACHE
+from app.core.pdf_toWord import build_word_document
+from app.core.pdf_pipeline import run_pipeline
+from benchmarks.corpus import CORPUS, QUICK, build_pdf
+
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+
+def build_docx(structured, writer=None):
+    buffer = BytesIO()
+    build_word_document(structured, buffer, writer=writer)
+    return buffer
+
+
+def stages_for(pdf_bytes: bytes):
+    """
+    Returns (stage name, zero-argument callable) pairs. Later stages get
+    their input prepared up front so only the stage itself is timed.
+    """
+    text, _ = extract_best_text(pdf_bytes)
+    structured = group_content_under_headings(text)
+
+    return [
+        ("extract_text_pymupdf", lambda: extract_text_pymupdf(pdf_bytes)),
+        ("extract_text_from_pdf", lambda: extract_text_from_pdf(pdf_bytes)),
+        ("extract_text_pdfminer", lambda: extract_text_pdfminer(pdf_bytes)),
+        ("group_content_under_headings", lambda: group_content_under_headings(text)),
+        ("build_word_document", lambda: build_docx(structured, "python-docx")),
+        ("build_word_document_xml", lambda: build_docx(structured, "xml")),
+        ("pipeline", lambda: run_pipeline(pdf_bytes)),
+    ]
+
+
+def reset_caches():
+    # Every run starts cold, otherwise repeats only time cache lookups
+    PAGE_CACHE.clear()
+    FONT_TABLES.clear()
+    line_features.cache_clear()
+
+
+def measure(fn, repeat: int) -> dict:
+    timings = []
+    for _ in range(repeat):
+        reset_caches()
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+
+    # Separate run for memory, tracemalloc slows the code down
+    reset_caches()
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "seconds": round(statistics.median(timings), 6),
+        "min_seconds": round(min(timings), 6),
+        "peak_mb": round(peak / (1024 * 1024), 3),
+    }
+
+
+def run(names, repeat: int) -> dict:
+    results = {}
+
+    for name in names:
+        pdf_bytes = build_pdf(name)
+        pages = pdf_page_count(pdf_bytes)
+        results[name] = {}
+
+        for stage, fn in stages_for(pdf_bytes):
+            stats = measure(fn, repeat)
+            stats["pages_per_second"] = round(pages / stats["seconds"], 2) if stats["seconds"] else 0.0
+            results[name][stage] = stats
+
+            print(
+                f"{name:<20} {stage:<30} {stats['seconds'] * 1000:9.1f} ms "
+                f"{stats['pages_per_second']:9.1f} pages/s {stats['peak_mb']:8.2f} MB"
+            )
+
+    return results
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """
+    Returns a list of regression messages (empty when everything is within tolerance).
+    """
+    regressions = []
+
+    for name, stages in results.items():
+        for stage, stats in stages.items():
+            reference = baseline.get(name, {}).get(stage)
+            if not reference:
+                continue
+
+            for metric in ("seconds", "peak_mb"):
+                limit = reference[metric] * (1 + tolerance)
+                if stats[metric] > limit:
+                    regressions.append(
+                        f"{name} / {stage}: {metric} {stats[metric]:.3f} > baseline "
+                        f"{reference[metric]:.3f} (+{tolerance:.0%})"
+                    )
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the PDF to Word pipeline.")
+    parser.add_argument("--quick", action="store_true", help="only run the small quick subset")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per stage (median is reported)")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown before a regression is reported")
+    parser.add_argument("--save-baseline", action="store_true", help="store the results as the new baseline")
+    parser.add_argument("--output", help="also write the results to this JSON file")
+    args = parser.parse_args()
+
+    names = QUICK if args.quick else list(CORPUS)
+    results = run(names, args.repeat)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    if args.save_baseline:
+        baseline = {}
+        if os.path.exists(BASELINE_PATH):
+            with open(BASELINE_PATH, "r", encoding="utf-8") as f:
+                baseline = json.load(f)
+        baseline.update(results)
+
+        with open(BASELINE_PATH, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print("Baseline written to", BASELINE_PATH)
+        return
+
+    if not os.path.exists(BASELINE_PATH):
+        print("No baseline found, run with --save-baseline first")
+        return
+
+    with open(BASELINE_PATH, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print("\nRegressions:")
+        for message in regressions:
+            print("-", message)
+        sys.exit(1)
+
+    print("\nNo regressions against baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Cold-start benchmark for the API entry point.
+
+Every scenario runs in a fresh interpreter, the way a serverless cold
+start does, and reports the median import time plus which heavy PDF and
+Word libraries ended up loaded.
+
+Scenarios:
+    api                  import app.api.main (what a cold start pays for GET /)
+    api + backends       the same, then load every backend (the cost before
+                         the backends were imported lazily, and what the first
+                         conversion or PDF_WARMUP=1 pays now)
+
+Usage:
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --repeat 10
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = ("fitz", "pdfplumber", "pdfminer", "docx")
+
+SCENARIOS = {
+    "api": "import app.api.main",
+    "api + backends": "import app.api.main\nfrom app.core.pdf_pipeline import warm_up\nwarm_up()",
+}
+
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+{code}
+seconds = time.perf_counter() - started
+print(json.dumps({{"seconds": seconds, "modules": [m for m in {modules!r} if m in sys.modules]}}))
+"""
+
+
+def measure(code: str, repeat: int) -> dict:
+    env = dict(os.environ, PYTHONPATH=REPO_ROOT, PYTHONWARNINGS="ignore")
+    probe = PROBE.format(code=code, modules=HEAVY_MODULES)
+
+    timings = []
+    modules = []
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", probe], cwd=REPO_ROOT, env=env,
+            capture_output=True, text=True, check=True
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        timings.append(result["seconds"])
+        modules = result["modules"]
+
+    return {
+        "seconds": round(statistics.median(timings), 4),
+        "min_seconds": round(min(timings), 4),
+        "modules": modules,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark API cold-start import time.")
+    parser.add_argument("--repeat", type=int, default=5, help="fresh interpreters per scenario (median is reported)")
+    parser.add_argument("--output", help="also write the results to this JSON file")
+    args = parser.parse_args()
+
+    results = {}
+    for name, code in SCENARIOS.items():
+        stats = measure(code, args.repeat)
+        results[name] = stats
+
+        loaded = ", ".join(stats["modules"]) or "none"
+        print(f"{name:<20} {stats['seconds'] * 1000:9.1f} ms   heavy modules loaded: {loaded}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Synthetic PDF corpus for the benchmarks.
+
+Every document is generated locally with PyMuPDF from a fixed seed,
+so the corpus is identical on every machine and nothing is downloaded.
+"""
+import random
+
+import fitz
+
+
+# name -> how the document is built
+CORPUS = {
+    "text-1p-helvetica": {"pages": 1, "font": "helv", "tables": 0, "cid": False},
+    "text-10p-times": {"pages": 10, "font": "tiro", "tables": 0, "cid": False},
+    "text-50p-courier": {"pages": 50, "font": "cour", "tables": 0, "cid": False},
+    "tables-10p": {"pages": 10, "font": "helv", "tables": 2, "cid": False},
+    "cid-5p": {"pages": 5, "font": "cjk", "tables": 0, "cid": True},
+}
+
+# Small subset for quick runs
+QUICK = ["text-1p-helvetica", "tables-10p", "cid-5p"]
+
+WORDS = (
+    "agreement party applicant address contract payment notice court section "
+    "schedule clause period amount service delivery term condition report "
+    "account balance invoice record review summary detail office district"
+).split()
+
+PAGE_MARGIN = 72
+LINE_HEIGHT = 14
+
+
+def sentence(rng: random.Random) -> str:
+    words = [rng.choice(WORDS) for _ in range(rng.randint(6, 14))]
+    return " ".join(words).capitalize() + ("." if rng.random() < 0.7 else ",")
+
+
+def draw_table(page, rng, top, rows=5, cols=3, fontname="helv"):
+    """
+    Draws a ruled table (lines + cell text), the way most PDF tables look.
+    Returns the y coordinate below the table.
+    """
+    left = PAGE_MARGIN
+    width = page.rect.width - 2 * PAGE_MARGIN
+    row_height = 18
+    col_width = width / cols
+
+    for r in range(rows + 1):
+        y = top + r * row_height
+        page.draw_line((left, y), (left + width, y))
+    for c in range(cols + 1):
+        x = left + c * col_width
+        page.draw_line((x, top), (x, top + rows * row_height))
+
+    for r in range(rows):
+        for c in range(cols):
+            text = rng.choice(WORDS).upper() if r == 0 else rng.choice(WORDS)
+            page.insert_text((left + c * col_width + 4, top + r * row_height + 13), text, fontname=fontname, fontsize=9)
+
+    return top + rows * row_height + LINE_HEIGHT
+
+
+def build_pdf(name: str, seed: int = 0) -> bytes:
+    spec = CORPUS[name]
+    rng = random.Random(f"{name}:{seed}")
+    doc = fitz.open()
+
+    fontname = spec["font"]
+    fontbuffer = fitz.Font("cjk").buffer if spec["cid"] else None
+
+    for page_index in range(spec["pages"]):
+        page = doc.new_page()
+        if fontbuffer:
+            page.insert_font(fontname=fontname, fontbuffer=fontbuffer)
+
+        y = PAGE_MARGIN
+        bottom = page.rect.height - PAGE_MARGIN
+        tables_left = spec["tables"]
+
+        if page_index == 0:
+            page.insert_text((PAGE_MARGIN + 150, y), "BENCHMARK DOCUMENT", fontname=fontname, fontsize=16)
+            y += 2 * LINE_HEIGHT
+
+        while y < bottom - LINE_HEIGHT:
+            page.insert_text((PAGE_MARGIN, y), " ".join(rng.choice(WORDS) for _ in range(3)).upper(), fontname=fontname, fontsize=12)
+            y += LINE_HEIGHT
+
+            for _ in range(rng.randint(3, 8)):
+                if y >= bottom:
+                    break
+                page.insert_text((PAGE_MARGIN, y), sentence(rng), fontname=fontname, fontsize=10)
+                y += LINE_HEIGHT
+
+            if tables_left and y < bottom - 120:
+                y = draw_table(page, rng, y, fontname=fontname)
+                tables_left -= 1
+
+    if spec["cid"]:
+        # Strip the embedded font program and ToUnicode map so text can only
+        # be read back as (cid:NN) glyph codes, like broken real-world PDFs
+        doc.subset_fonts()
+        for xref in range(1, doc.xref_length()):
+            obj = doc.xref_object(xref)
+            if "/ToUnicode" in obj:
+                doc.xref_set_key(xref, "ToUnicode", "null")
+            if "/FontFile2" in obj:
+                doc.xref_set_key(xref, "FontFile2", "null")
+
+    data = doc.tobytes(garbage=3, deflate=True)
+    doc.close()
+    return data
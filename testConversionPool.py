@@ -0,0 +1,38 @@
+import asyncio
+import os
+from concurrent.futures.process import BrokenProcessPool
+
+from app.core.pdf_worker import ConversionPool
+
+
+def answer():
+    return 42
+
+
+def crash():
+    # What an OOM kill or a segfault in a native library looks like to the pool
+    os._exit(1)
+
+
+async def main():
+    pool = ConversionPool(mode="process", workers=1, queue_limit=0, timeout=30)
+    try:
+        assert await pool.run(answer) == 42
+
+        try:
+            await pool.run(crash)
+            raise AssertionError("crashing job did not fail")
+        except BrokenProcessPool:
+            pass
+
+        # The pool recovers: slot and queue place are released, a new process pool is started
+        assert await pool.run(answer) == 42
+        assert await pool.run(answer) == 42
+        assert pool.pending == 0 and pool.running == 0
+    finally:
+        pool.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
+    print("Conversion pool recovered from a dead worker")